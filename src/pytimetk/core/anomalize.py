@@ -7,9 +7,17 @@ from typing import Union, Optional
 from pytimetk.utils.checks import check_dataframe_or_groupby, check_date_column, check_value_column
 from pytimetk.core.frequency import get_frequency, get_seasonal_frequency, get_trend_frequency
 
-from pytimetk.utils.parallel_helpers import parallel_apply, get_threads, progress_apply
+from pytimetk.utils.parallel_helpers import get_threads, conditional_tqdm
 
-from statsmodels.tsa.seasonal import seasonal_decompose
+from functools import partial
+from pathos.multiprocessing import ProcessingPool
+
+from scipy.signal import fftconvolve
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 @pf.register_dataframe_method
 def anomalize(
@@ -28,6 +36,8 @@ def anomalize(
     threads: int = 1,
     show_progress: bool = True,
     verbose = False,
+    anomaly_as_string: bool = True,
+    precision: str = 'f64',
 ) -> pd.DataFrame:
     '''
     The `anomalize` function is used to detect anomalies in time series data, 
@@ -104,16 +114,31 @@ def anomalize(
         The `threads` parameter specifies the number of threads to use for parallel 
         processing. By default, it is set to `1`, which means no parallel processing 
         is used. If you set `threads` to `-1`, it will use all available processors 
-        for parallel processing.
+        for parallel processing. Not used when the groups are decomposed 
+        together (see Notes).
     show_progress : bool
         A boolean parameter that determines whether to show a progress bar during 
         the execution of the function. If set to True, a progress bar will be 
-        displayed. If set to False, no progress bar will be shown.
+        displayed. If set to False, no progress bar will be shown. Not used when 
+        the groups are decomposed together (see Notes).
     verbose: bool
         The `verbose` parameter is a boolean flag that determines whether or not to 
         display additional information and progress updates during the execution of 
         the `anomalize` function. If `verbose` is set to `True`, you will see more 
         detailed output. 
+    anomaly_as_string : bool
+        The `anomaly_as_string` parameter determines the type of the `anomaly` 
+        column. If `True` (default), anomalies are flagged with "Yes"/"No" 
+        (a categorical column). If `False`, the `anomaly` column is a boolean column, which 
+        uses less memory and is faster to filter on.
+    precision : str, optional, default 'f64'
+        Floating point precision of the decomposition and outlier calculations.
+        
+        The options are:
+            - "f64" (default): 64-bit floats.
+            - "f32": 32-bit floats. This halves the memory traffic on large 
+              data, at the cost of precision, and the decomposition columns 
+              are returned as `float32`.
         
     Returns
     -------
@@ -126,7 +151,7 @@ def anomalize(
         - seasadaj: seasonal adjusted
         - trend: trend component
         - remainder: residual component
-        - anomaly: Yes/No flag for outlier detection
+        - anomaly: Yes/No (or boolean) flag for outlier detection
         - anomaly score: distance from centerline
         - anomaly direction: -1, 0, 1 inidicator for direction of the anomaly
         - recomposed_l1: lower level bound of recomposed time series
@@ -145,6 +170,12 @@ def anomalize(
     
     To use parallel processing, set `threads = -1` to use all available processors.
     
+    When all groups have the same number of observations (and the same dates, 
+    if `period` or `trend` is not provided), the groups are stacked and 
+    decomposed together in a single vectorized pass. In that case `threads` 
+    and `show_progress` are not used. Otherwise the groups are processed one 
+    group at a time.
+    
     
     Examples
     --------
@@ -276,6 +307,11 @@ def anomalize(
     check_date_column(data, date_column)
     check_value_column(data, value_column)
     
+    # Check the floating point precision
+    if precision not in ('f32', 'f64'):
+        raise ValueError("Invalid precision. Use 'f32' or 'f64'.")
+    dtype = np.float32 if precision == 'f32' else np.float64
+    
     if isinstance(data, pd.DataFrame):
         result = _anomalize(
             data = data, 
@@ -291,6 +327,8 @@ def anomalize(
             max_anomalies=max_anomalies,
             bind_data=bind_data,
             verbose=verbose,
+            anomaly_as_string=anomaly_as_string,
+            dtype=dtype,
         )
     
     if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy):
@@ -300,14 +338,32 @@ def anomalize(
         # Get threads
         threads = get_threads(threads)
         
-        if threads == 1:
+        # Equal-length groups are stacked and decomposed in a single call
+        if _is_stackable(data, date_column, period, trend, method):
             
-            result = progress_apply(
+            result = _anomalize_stacked(
+                data = data,
+                date_column=date_column, 
+                value_column=value_column,
+                period=period,
+                trend=trend,
+                method=method,
+                decomp=decomp,
+                clean=clean,
+                iqr_alpha=iqr_alpha,
+                clean_alpha=clean_alpha,
+                max_anomalies=max_anomalies,
+                bind_data=bind_data,
+                verbose=verbose,
+                anomaly_as_string=anomaly_as_string,
+                dtype=dtype,
+            )
+        
+        elif threads == 1:
+            
+            result = _anomalize_groups(
                 data, 
-                func = _anomalize, 
                 show_progress=show_progress,
-                desc="Anomalizing...",
-                # kwargs
                 date_column=date_column, 
                 value_column=value_column,
                 period=period,
@@ -320,13 +376,17 @@ def anomalize(
                 max_anomalies=max_anomalies,
                 bind_data=bind_data,
                 verbose=verbose,
-            ).reset_index(level=group_names)
+                anomaly_as_string=anomaly_as_string,
+                dtype=dtype,
+            )
             
         else:
         
-            result = parallel_apply(
+            # One task per chunk of groups rather than per group
+            result = _parallel_anomalize_chunks(
                 data, 
-                _anomalize, 
+                threads=threads,
+                show_progress=show_progress,
                 date_column=date_column, 
                 value_column=value_column,
                 period=period,
@@ -338,11 +398,10 @@ def anomalize(
                 clean_alpha=clean_alpha,
                 max_anomalies=max_anomalies,
                 bind_data=bind_data,
-                threads=threads,
-                show_progress=show_progress,
                 verbose=verbose,
-                desc="Anomalizing...",
-            ).reset_index(level=group_names)
+                anomaly_as_string=anomaly_as_string,
+                dtype=dtype,
+            )
     
     return result
 
@@ -350,6 +409,103 @@ def anomalize(
 pd.core.groupby.generic.DataFrameGroupBy.anomalize = anomalize
 
 
+def _parallel_anomalize_chunks(
+    data: pd.core.groupby.generic.DataFrameGroupBy,
+    threads: int,
+    show_progress: bool = True,
+    **kwargs,
+) -> pd.DataFrame:
+    
+    group_names = data.grouper.names
+    
+    # Split the groups into one contiguous chunk of groups per thread, so each 
+    # worker receives a single DataFrame instead of one DataFrame per group
+    group_ids = data.ngroup().to_numpy()
+    
+    chunk_ids = [ids for ids in np.array_split(np.arange(data.ngroups), threads) if len(ids) > 0]
+    
+    chunks = [
+        data.obj[(group_ids >= ids[0]) & (group_ids <= ids[-1])] 
+        for ids in chunk_ids
+    ]
+    
+    func = partial(
+        _anomalize_chunk, 
+        group_names=group_names, 
+        sort=data.sort, 
+        dropna=data.dropna, 
+        **kwargs
+    )
+    
+    pool = ProcessingPool(threads)
+    
+    results = list(conditional_tqdm(
+        pool.map(func, chunks), 
+        total=len(chunks), 
+        display=show_progress, 
+        desc="Anomalizing...",
+    ))
+    
+    return pd.concat(results, axis=0)
+
+
+def _anomalize_chunk(
+    data: pd.DataFrame,
+    group_names: list,
+    sort: bool = True,
+    dropna: bool = True,
+    **kwargs,
+) -> pd.DataFrame:
+    
+    grouped = data.groupby(group_names, sort=sort, dropna=dropna)
+    
+    return _anomalize_groups(grouped, show_progress=False, **kwargs)
+
+
+def _anomalize_groups(
+    data: pd.core.groupby.generic.DataFrameGroupBy,
+    show_progress: bool = True,
+    bind_data: bool = False,
+    **kwargs,
+) -> pd.DataFrame:
+    
+    group_names = data.grouper.names
+    
+    frequency_cache = {}
+    
+    # Take each group's rows from the precomputed indices rather than going 
+    # through groupby.apply
+    results = []
+    first_rows = []
+    sizes = []
+    for idx in conditional_tqdm(
+        data.indices.values(), 
+        total=data.ngroups, 
+        display=show_progress, 
+        desc="Anomalizing...",
+    ):
+        result = _anomalize(
+            data.obj.take(idx), 
+            bind_data=bind_data, 
+            frequency_cache=frequency_cache, 
+            **kwargs
+        )
+        results.append(result)
+        first_rows.append(idx[0])
+        sizes.append(len(idx))
+    
+    result = pd.concat(results, axis=0)
+    
+    # Bound data already holds the group columns. Otherwise repeat each 
+    # group's key once per row in a single vectorized step.
+    if not bind_data:
+        for i, group_name in enumerate(group_names):
+            keys = data.obj[group_name].to_numpy()[first_rows]
+            result.insert(i, group_name, np.repeat(keys, sizes))
+    
+    return result
+
+
 def _anomalize(
     data: Union[pd.DataFrame, pd.core.groupby.generic.DataFrameGroupBy],
     date_column: str,
@@ -364,58 +520,51 @@ def _anomalize(
     max_anomalies: float = 0.2,
     bind_data: bool = False,
     verbose = False,
+    anomaly_as_string: bool = True,
+    dtype = np.float64,
+    frequency_cache: Optional[dict] = None,
 ) -> pd.DataFrame:
     
-    orig_date_column = data[date_column]
-    
-    data = data.copy()
-    
-    
-    
     # STEP 0: Get the seasonal period and trend frequency
-    if period is None:
-        
-        period = get_seasonal_frequency(data[date_column], numeric=True)
-        
-        period = int(period)
-        
-        if verbose:
-            print(f"Using seasonal frequency of {period} observations")
+    period, trend = _get_period_and_trend(
+        dates = data[date_column], 
+        period = period, 
+        trend = trend, 
+        verbose = verbose, 
+        frequency_cache = frequency_cache,
+        infer_trend = method == 'twitter',
+    )
     
+    # STEP 1: Decompose the time series
     
-    if trend is None:
-            
-        trend = get_trend_frequency(data[date_column], numeric=True)
-        
-        trend = int(trend)
-        
-        if verbose:
-            print(f"Using trend frequency of {trend} observations")
+    # Contiguous values in a single float dtype for all downstream kernels
+    values = np.ascontiguousarray(data[value_column].to_numpy(), dtype=dtype)
     
-    # STEP 1: Decompose the time series
     if method == 'twitter':
                     
         median_span = np.round(len(data) / trend)
         median_span = int(median_span)
 
-        result = _twitter_decompose(
-            data = data, 
-            date_column=date_column, 
-            value_column=value_column, 
+        components = _twitter_decompose(
+            values=values, 
             period=period,
             median_span=median_span, 
             model=decomp,
         )
     else:
-        result = _seasonal_decompose(
-            data=data, 
-            date_column=date_column, 
-            value_column=value_column, 
+        components = _seasonal_decompose(
+            values=values, 
             period=period,
             model=decomp,
-            extrapolate_trend = 'freq'
         )
     
+    result = pd.DataFrame({
+        # Dates are attached once, as an array (keeps any timezone)
+        date_column: data[date_column].array,
+        'observed': data[value_column].to_numpy(),
+        **components,
+    }, index=data.index)
+    
     # STEP 2: Identify the outliers
     
     outlier_df = _iqr(
@@ -438,132 +587,390 @@ def _anomalize(
     # STEP 4: Clean the Anomalies
     
     if clean == 'linear':
-        result['observed_clean'] = result['observed'] \
-            .where(result['anomaly']=='No', np.nan) \
-            .interpolate(method=clean, limit_direction='both')
+        observed_masked = np.where(
+            result['anomaly'].to_numpy(), np.nan, result['observed'].to_numpy()
+        )
+        result['observed_clean'] = pd.Series(observed_masked, index=result.index) \
+            .interpolate(method=clean, limit_direction='both') \
+            .to_numpy()
     else:
         # min_max
-        result['observed_clean'] = np.where(
-            result['anomaly_direction'] == -1, 
-            clean_alpha*result['recomposed_l1'],
-            np.where(
-                result['anomaly_direction'] == 1, 
-                clean_alpha*result['recomposed_l2'], 
-                result['observed']
-            )
+        result['observed_clean'] = _clean_min_max(
+            observed = result['observed'].to_numpy(),
+            recomposed_l1 = result['recomposed_l1'].to_numpy(),
+            recomposed_l2 = result['recomposed_l2'].to_numpy(),
+            direction = result['anomaly_direction'].to_numpy(),
+            clean_alpha = clean_alpha,
         )
-        
-        
-    result[date_column] = orig_date_column
     
-    # STEP 5: Bind the data
+    if anomaly_as_string:
+        result['anomaly'] = _anomaly_labels(result['anomaly'].to_numpy())
+    
+    # STEP 5: Bind the data, column by column (no concat or drop)
     if bind_data:
-        result = pd.concat([data, result.drop(date_column, axis=1)], axis=1)
+        result = pd.DataFrame({
+            **{column: data[column].array for column in data.columns},
+            **{column: result[column].array for column in result.columns if column != date_column},
+        }, index=data.index)
     
     return result
 
  
-def _twitter_decompose(
-    data, 
-    date_column, 
-    value_column, 
-    period = None, 
-    median_span = None,
-    model = 'additive',
+def _get_period_and_trend(
+    dates: pd.Series,
+    period: Optional[int] = None,
+    trend: Optional[int] = None,
+    verbose: bool = False,
+    frequency_cache: Optional[dict] = None,
+    infer_trend: bool = True,
 ):
-    orig_index = data.index
+    
+    # Groups with the same dates infer the same frequencies, so the inferred 
+    # values are looked up by the hashed dates
+    if frequency_cache is None:
+        frequency_cache = {}
+        key = None
+    else:
+        key = pd.util.hash_pandas_object(dates, index=False).to_numpy().tobytes()
+    
+    if period is None:
         
-    series = data.set_index(date_column)[value_column]
-     
+        if (key, 'period') not in frequency_cache:
+            frequency_cache[(key, 'period')] = int(get_seasonal_frequency(dates, numeric=True))
+            
+            if verbose:
+                print(f"Using seasonal frequency of {frequency_cache[(key, 'period')]} observations")
+        
+        period = frequency_cache[(key, 'period')]
     
-    # Need to add freq, trend, and kwargs
-    # TODO - Median Seasonal Trend (More robust to outliers)
-    result = seasonal_decompose(
-        series, 
-        period=period,
-        model=model,
-        extrapolate_trend='freq',
+    # The trend frequency is only used by the twitter method
+    if trend is None and infer_trend:
+        
+        if (key, 'trend') not in frequency_cache:
+            frequency_cache[(key, 'trend')] = int(get_trend_frequency(dates, numeric=True))
+            
+            if verbose:
+                print(f"Using trend frequency of {frequency_cache[(key, 'trend')]} observations")
+        
+        trend = frequency_cache[(key, 'trend')]
+    
+    return period, trend
+
+
+def _is_stackable(
+    data: pd.core.groupby.generic.DataFrameGroupBy,
+    date_column: str,
+    period: Optional[int] = None,
+    trend: Optional[int] = None,
+    method: str = 'twitter',
+) -> bool:
+    
+    group_sizes = data.size().to_numpy()
+    
+    # Groups must have equal length and cover every row
+    if len(group_sizes) == 0 \
+        or (group_sizes != group_sizes[0]).any() \
+        or group_sizes.sum() != len(data.obj):
+        return False
+    
+    if period is not None and (trend is not None or method != 'twitter'):
+        return True
+    
+    # Period and trend are inferred from the dates, so they are the same for 
+    # every group only when all groups share the same dates
+    order = np.argsort(data.ngroup().to_numpy(), kind='stable')
+    
+    dates = data.obj[date_column].to_numpy()[order].reshape(len(group_sizes), -1)
+    
+    return bool((dates == dates[0]).all())
+
+
+def _anomalize_stacked(
+    data: pd.core.groupby.generic.DataFrameGroupBy,
+    date_column: str,
+    value_column: str,
+    period: Optional[int] = None,
+    trend: Optional[int] = None,
+    method: str = 'twitter',
+    decomp: str = 'additive',
+    clean: str = 'linear',
+    iqr_alpha: float = 0.05,
+    clean_alpha: float = 0.75,
+    max_anomalies: float = 0.2,
+    bind_data: bool = False,
+    verbose = False,
+    anomaly_as_string: bool = True,
+    dtype = np.float64,
+) -> pd.DataFrame:
+    
+    group_names = data.grouper.names
+    
+    # Order rows by group (stable, so each group keeps its row order)
+    order = np.argsort(data.ngroup().to_numpy(), kind='stable')
+    
+    df = data.obj.take(order)
+    
+    n_groups = data.ngroups
+    n_obs = len(df) // n_groups
+    
+    observed = df[value_column].to_numpy()
+    
+    # Values as a (T, G) array: one column per group
+    X = observed.astype(dtype).reshape(n_groups, n_obs).T
+    
+    # STEP 0: Get the seasonal period and trend frequency (same for all groups)
+    period, trend = _get_period_and_trend(
+        dates = df[date_column].iloc[:n_obs], 
+        period = period, 
+        trend = trend, 
+        verbose = verbose,
+        infer_trend = method == 'twitter',
     )
     
-    # Construct TS Decomposition DataFrame
-    observed = series
+    # STEP 1: Decompose all time series at once
+    decomposition_trend, seasonal = _fast_seasonal_decompose(X, period=period, model=decomp)
     
-    seasadj = series - result.seasonal
-    seasadj.name = 'seasadj'
+    seasadj = X - seasonal
     
-    # Calculate median trend
-    if median_span is None:
-        median_span = 4
+    if method == 'twitter':
+        
+        median_span = int(np.round(n_obs / trend))
+        
+        trend_values = _median_trend(seasadj, median_span)
+    else:
+        trend_values = decomposition_trend
     
-    def repeat_sequence(seq, length_out):
-        quotient, remainder = divmod(length_out, len(seq))
-        return seq * quotient + seq[:remainder]
+    remainder = seasadj - trend_values
     
-    df = pd.DataFrame(seasadj)
+    # STEP 2: Identify the outliers
+    score, direction, outlier, limit_l1, limit_l2 = _iqr_core(remainder, iqr_alpha)
     
-    df['median_index'] = sorted(repeat_sequence(list(range(median_span)), len(seasadj)))
+    # STEP 3: Recompose the time series
+    recomposed_l1 = seasonal + trend_values + limit_l1
+    recomposed_l2 = seasonal + trend_values + limit_l2
     
-    trend = df.groupby('median_index')['seasadj'].transform('median')
+    # STEP 4: Clean the Anomalies
+    if clean == 'linear':
+        observed_clean = pd.DataFrame(np.where(outlier, np.nan, X)) \
+            .interpolate(method=clean, limit_direction='both') \
+            .to_numpy()
+    else:
+        # min_max
+        observed_clean = _clean_min_max(
+            observed = X,
+            recomposed_l1 = recomposed_l1,
+            recomposed_l2 = recomposed_l2,
+            direction = direction,
+            clean_alpha = clean_alpha,
+        )
     
-    resid = seasadj - trend
+    # Back to long format, in group order
+    def _long(values):
+        return np.broadcast_to(values, X.shape).T.ravel()
+    
+    components = {
+        'observed': observed,
+        'seasonal': _long(seasonal),
+        'seasadj': _long(seasadj),
+        'trend': _long(trend_values),
+        'remainder': _long(remainder),
+        'anomaly': _long(outlier),
+        'anomaly_score': _long(score),
+        'anomaly_direction': _long(direction),
+        'recomposed_l1': _long(recomposed_l1),
+        'recomposed_l2': _long(recomposed_l2),
+        'observed_clean': _long(observed_clean),
+    }
+    
+    if anomaly_as_string:
+        components['anomaly'] = _anomaly_labels(components['anomaly'])
+    
+    # STEP 5: Bind the data, column by column (no concat)
+    if bind_data:
+        keep_columns = list(df.columns)
+    else:
+        keep_columns = list(group_names) + [date_column]
+    
+    result = pd.DataFrame({
+        **{column: df[column].array for column in keep_columns},
+        **components,
+    }, index=df.index)
+    
+    return result
+
+
+def _anomaly_labels(outlier):
+    
+    # Categorical "No"/"Yes": one byte per row and integer-code comparisons
+    return pd.Categorical.from_codes(outlier.astype(np.int8), categories=["No", "Yes"])
+
+
+def _clean_min_max(observed, recomposed_l1, recomposed_l2, direction, clean_alpha):
+    
+    # Rows 0, 1, 2 hold the value for direction -1, 0, 1: a single gather 
+    # instead of nested np.where
+    choices = np.stack([
+        clean_alpha*recomposed_l1, 
+        observed, 
+        clean_alpha*recomposed_l2,
+    ], axis=0)
+    
+    idx = (direction.astype(np.intp) + 1)[np.newaxis]
     
+    return np.take_along_axis(choices, idx, axis=0)[0]
+
+
+def _median_trend(seasadj, median_span):
+    
+    # Contiguous spans of (nearly) equal length, first spans take the extra rows
+    quotient, remainder = divmod(len(seasadj), median_span)
+    
+    span_sizes = np.full(median_span, quotient)
+    span_sizes[:remainder] += 1
+    
+    # Equal spans: a single reshaped median
+    if remainder == 0 and quotient > 0:
+        span_medians = np.nanmedian(
+            seasadj.reshape((median_span, quotient) + seasadj.shape[1:]), axis=1
+        )
+        return np.repeat(span_medians, quotient, axis=0)
+    
+    span_ends = np.cumsum(span_sizes)
     
-    result_df = pd.concat([observed, result.seasonal, seasadj, trend, resid], axis=1)
+    trend = np.empty_like(seasadj)
+    for start, end in zip(span_ends - span_sizes, span_ends):
+        trend[start:end] = np.nanmedian(seasadj[start:end], axis=0)
     
-    result_df.columns = ['observed', 'seasonal', 'seasadj', 'trend', 'remainder']
+    return trend
     
-    result_df.reset_index(inplace=True)
 
+def _twitter_decompose(
+    values, 
+    period = None, 
+    median_span = None,
+    model = 'additive',
+):
+    
+    # TODO - Median Seasonal Trend (More robust to outliers)
+    _, seasonal = _fast_seasonal_decompose(values, period=period, model=model)
     
-    result_df.index = orig_index
+    seasadj = values - seasonal
     
-    return result_df 
+    # Calculate median trend
+    if median_span is None:
+        median_span = 4
+    
+    trend = _median_trend(seasadj, median_span)
+    
+    resid = seasadj - trend
+    
+    return {
+        'seasonal': seasonal,
+        'seasadj': seasadj,
+        'trend': trend,
+        'remainder': resid,
+    }
      
 
 def _seasonal_decompose(
-    data, 
-    date_column, 
-    value_column, 
+    values, 
     model='additive',
     period = None, 
-    filt=None,
-    two_sided=True, 
-    extrapolate_trend = 'freq'
 ):
     
-    orig_index = data.index
+    trend, seasonal = _fast_seasonal_decompose(values, period=period, model=model)
+    
+    seasadj = values - seasonal
+    
+    resid = seasadj - trend
         
-    series = data.set_index(date_column)[value_column]
-     
+    return {
+        'seasonal': seasonal,
+        'seasadj': seasadj,
+        'trend': trend,
+        'remainder': resid,
+    }
+
+
+def _fast_seasonal_decompose(x, period, model='additive'):
     
-    # Need to add freq, trend, and kwargs
-    result = seasonal_decompose(
-        series, 
-        model=model,
-        period = period,
-        filt=filt,
-        two_sided=two_sided,
-        extrapolate_trend = extrapolate_trend,
-    )
+    # Same decomposition as statsmodels' seasonal_decompose(two_sided=True, 
+    # extrapolate_trend='freq'), for a 1-D series or a (T, G) array of series
+    x = np.asarray(x)
     
-    # Construct TS Decomposition DataFrame
-    observed = series
+    if not np.issubdtype(x.dtype, np.floating):
+        x = x.astype(float)
     
-    seasadj = series - result.seasonal
+    n_obs = x.shape[0]
+    multiplicative = model.startswith('m')
     
-    trend = result.trend
+    if not np.all(np.isfinite(x)):
+        raise ValueError("This function does not handle missing values")
+    if multiplicative and np.any(x <= 0):
+        raise ValueError(
+            "Multiplicative seasonality is not appropriate for zero and negative values"
+        )
+    if n_obs < 2 * period:
+        raise ValueError(
+            f"x must have 2 complete cycles requires {2 * period} "
+            f"observations. x only has {n_obs} observation(s)"
+        )
     
-    resid = seasadj - trend
-        
-    result_df = pd.concat([observed, result.seasonal, seasadj, trend, resid], axis=1)
+    # Centered moving average trend, via FFT convolution
+    if period % 2 == 0:
+        filt = np.array([0.5] + [1] * (period - 1) + [0.5]) / period
+    else:
+        filt = np.repeat(1.0 / period, period)
+    
+    filt = filt.reshape((-1,) + (1,) * (x.ndim - 1))
+    
+    trend_valid = fftconvolve(x, filt, mode='valid', axes=0)
+    
+    front = int(np.ceil(len(filt) / 2) - 1)
+    back = front + len(trend_valid) - 1
+    
+    trend = np.empty_like(x)
+    trend[front:back + 1] = trend_valid
+    
+    # Extrapolate the trend ends with least squares lines fitted on the 
+    # `period` closest points
+    front_last = min(front + period, back)
+    back_first = max(front, back - period)
+    
+    idx = np.arange(front, front_last)
+    slope, intercept = np.polyfit(idx, trend[front:front_last], 1)
+    trend[:front] = np.multiply.outer(np.arange(0, front), slope) + intercept
+    
+    idx = np.arange(back_first, back)
+    slope, intercept = np.polyfit(idx, trend[back_first:back], 1)
+    trend[back + 1:] = np.multiply.outer(np.arange(back + 1, n_obs), slope) + intercept
+    
+    # Seasonal component: mean of the detrended values at each seasonal phase
+    if multiplicative:
+        detrended = x / trend
+    else:
+        detrended = x - trend
+    
+    # Rows ordered by phase are contiguous per phase, so a single reduceat 
+    # pass sums every phase (partial last cycle included)
+    phase = np.arange(n_obs) % period
+    phase_order = np.argsort(phase, kind='stable')
+    phase_counts = np.bincount(phase, minlength=period)
+    phase_starts = np.r_[0, np.cumsum(phase_counts)[:-1]]
     
-    result_df.columns = ['observed', 'seasonal', 'seasadj', 'trend', 'remainder']
+    phase_sums = np.add.reduceat(detrended[phase_order], phase_starts, axis=0)
     
-    result_df.reset_index(inplace=True)
+    period_averages = phase_sums / phase_counts.astype(x.dtype).reshape((-1,) + (1,) * (x.ndim - 1))
     
-    result_df.index = orig_index
+    if multiplicative:
+        period_averages /= np.mean(period_averages, axis=0)
+    else:
+        period_averages -= np.mean(period_averages, axis=0)
+    
+    seasonal = period_averages[phase]
+    
+    return trend, seasonal
 
-    return result_df 
 
 def _iqr(data, target, alpha=0.05, max_anoms=0.2):
     """
@@ -586,32 +993,118 @@ def _iqr(data, target, alpha=0.05, max_anoms=0.2):
     ```
     """
     
-    data = data.copy()
+    score, direction, outlier, limit_l1, limit_l2 = _iqr_core(
+        data[target].to_numpy(dtype=float).reshape(-1, 1), alpha
+    )
     
-    # Compute the interquartile range
-    q1, q3 = np.percentile(data[target], [25, 75])
-    iq_range = q3 - q1
-    limits = [-1*(q1 + (0.15 / alpha) * iq_range), q3 + (0.15 / alpha) * iq_range]
+    # New columns only, the input data is not copied
+    return pd.DataFrame({
+        # Boolean flag for outlier
+        'outlier_reported': outlier[:, 0],
+        # Direction of the outlier
+        'direction': direction[:, 0],
+        # Anomaly score: distance from the centerline
+        'score': score[:, 0],
+        # Remainder Limits
+        'remainder_l1': limit_l1[0],
+        'remainder_l2': limit_l2[0],
+    }, index=data.index)
 
-    # Identify the outliers
-    outlier_idx = (data[target] < limits[0]) | (data[target] > limits[1])
-    outlier_vals = data.loc[outlier_idx, target]
 
+def _iqr_numpy(remainder, alpha):
+    
+    # Compute the interquartile range of each column. Quartiles use linear 
+    # interpolation like np.percentile, from a partial sort (O(n) introselect)
+    n_obs = remainder.shape[0]
+    
+    positions = np.array([0.25, 0.75]) * (n_obs - 1)
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, n_obs - 1)
+    fraction = (positions - lower).reshape((-1,) + (1,) * (remainder.ndim - 1))
+    
+    partitioned = np.partition(remainder, np.unique(np.r_[lower, upper]), axis=0)
+    
+    q1, q3 = partitioned[lower] + (partitioned[upper] - partitioned[lower]) * fraction
+    iq_range = q3 - q1
+    limit_l1 = -1*(q1 + (0.15 / alpha) * iq_range)
+    limit_l2 = q3 + (0.15 / alpha) * iq_range
+    
     # Calculate the anomaly_score from the centerline
-    centerline = sum(limits) / 2
-    data['score'] = abs(data[target] - centerline)
+    centerline = (limit_l1 + limit_l2) / 2
+    score = np.abs(remainder - centerline)
+    
+    # Direction of the outlier
+    direction = np.where(
+        remainder > limit_l2, 1, np.where(remainder < limit_l1, -1, 0)
+    ).astype(np.int8)
+    
+    outlier = direction != 0
+    
+    return score, direction, outlier, limit_l1, limit_l2
 
-    # Yes/No flag for outlier
-    data['outlier_reported'] = np.where(data[target] > limits[1], "Yes", np.where(data[target] < limits[0], "Yes", "No"))
 
-    # Direction of the outlier
-    data['direction'] = np.where(data[target] > limits[1], 1, np.where(data[target] < limits[0], -1, 0))
+def _partition_quantile(x, q):
+    
+    # Linear interpolation between order statistics (same as np.percentile), 
+    # using a partial sort instead of a full one
+    position = q * (len(x) - 1)
+    lower = int(np.floor(position))
+    fraction = position - lower
+    
+    x = np.partition(x, lower)
+    value = x[lower]
+    
+    if fraction > 0:
+        value = value + (np.min(x[lower + 1:]) - value) * fraction
+    
+    return value
+
+
+def _iqr_kernel(remainder, alpha):
+    
+    n_obs, n_series = remainder.shape
     
-    # Remainder Limits
-    data['remainder_l1'] = limits[0]
-    data['remainder_l2'] = limits[1]
+    score = np.empty((n_obs, n_series))
+    direction = np.empty((n_obs, n_series), dtype=np.int8)
+    outlier = np.empty((n_obs, n_series), dtype=np.bool_)
+    limit_l1 = np.empty(n_series)
+    limit_l2 = np.empty(n_series)
     
-    return data[['outlier_reported', 'direction', 'score', 'remainder_l1', 'remainder_l2']]
+    for j in range(n_series):
+        
+        x = remainder[:, j].copy()
+        
+        q1 = _partition_quantile(x, 0.25)
+        q3 = _partition_quantile(x, 0.75)
+        iq_range = q3 - q1
+        l1 = -1*(q1 + (0.15 / alpha) * iq_range)
+        l2 = q3 + (0.15 / alpha) * iq_range
+        
+        centerline = (l1 + l2) / 2
+        
+        # Single pass over the remainder
+        for i in range(n_obs):
+            value = remainder[i, j]
+            score[i, j] = abs(value - centerline)
+            if value > l2:
+                direction[i, j] = 1
+            elif value < l1:
+                direction[i, j] = -1
+            else:
+                direction[i, j] = 0
+            outlier[i, j] = direction[i, j] != 0
+        
+        limit_l1[j] = l1
+        limit_l2[j] = l2
     
+    return score, direction, outlier, limit_l1, limit_l2
 
 
+# Use the compiled kernel when numba is installed, otherwise plain numpy. 
+# Not compiled with parallel=True: numba's thread pool is not fork-safe and 
+# `threads > 1` forks worker processes through pathos.
+if njit is not None:
+    _partition_quantile = njit(cache=True)(_partition_quantile)
+    _iqr_core = njit(cache=True)(_iqr_kernel)
+else:
+    _iqr_core = _iqr_numpy
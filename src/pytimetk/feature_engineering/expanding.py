@@ -5,10 +5,15 @@ import numpy as np
 import inspect
 import warnings
 
+from functools import partial
+from pathos.multiprocessing import ProcessingPool
+
 from typing import Union, Optional, Callable, Tuple, List
 
 from pytimetk.utils.checks import check_dataframe_or_groupby, check_date_column, check_value_column
-from pytimetk.utils.polars_helpers import update_dict
+from pytimetk.utils.polars_helpers import update_dict, pl_quantile
+from pytimetk.utils.pandas_helpers import pd_quantile
+from pytimetk.utils.parallel_helpers import conditional_tqdm, get_threads
 
 @pf.register_dataframe_method
 def augment_expanding(
@@ -18,6 +23,9 @@ def augment_expanding(
     window_func: Union[str, list, Tuple[str, Callable]] = 'mean',
     min_periods: Optional[int] = None,
     engine: str = 'pandas',
+    threads: int = 1,
+    show_progress: bool = True,
+    precision: str = 'f64',
     **kwargs,
 ) -> pd.DataFrame:
     '''
@@ -62,6 +70,24 @@ def augment_expanding(
             - "pandas" (default): Uses the `pandas` library.
             - "polars": Uses the `polars` library, which may offer performance 
                benefits for larger datasets.
+    threads : int, optional, default 1
+        Number of threads to use for parallel processing of the groups with the 
+        Pandas engine. If `threads` is set to 1, parallel processing will be 
+        disabled. Set to -1 to use all available CPU cores.
+    show_progress : bool, optional, default True
+        If `True`, a progress bar will be displayed while the groups are 
+        processed with the Pandas engine.
+    precision : str, optional, default 'f64'
+        Floating point precision of the expanding calculations. 
+        
+        The options are:
+            - "f64" (default): 64-bit floats.
+            - "f32": 32-bit floats. This halves the memory traffic of the Polars 
+              expressions and of the cumulative `sum`, `mean`, `min`, `max` and 
+              `count` calculations in Pandas, and the new columns are returned as 
+              `float32`. Cumulative sums accumulate rounding error in 32-bit 
+              floats, so only use it when about 7 significant digits are enough. 
+              `std` and `var` are still computed in 64-bit floats.
         
     **kwargs : additional keyword arguments
         Additional arguments passed to the `pandas.Series.expanding` method when 
@@ -71,7 +97,19 @@ def augment_expanding(
     -------
     pd.DataFrame
         The `augment_expanding` function returns a DataFrame with new columns for 
-        each applied function, window size, and value column.
+        each applied function, window size, and value column. With the pandas 
+        engine, rows whose group key is missing are dropped when grouping with 
+        `dropna=True` (the default).
+    
+    Notes
+    -----
+    ## Performance
+    
+    With the Pandas engine, the groups can be processed in parallel to speed up 
+    computation for large datasets with many time series groups. Parallel 
+    processing has overhead and may not be faster on small datasets.
+    
+    To use parallel processing, set `threads = -1` to use all available processors.
         
     Examples
     --------
@@ -193,11 +231,35 @@ def augment_expanding(
     # Set min_periods to 1 if not specified
     min_periods = 1 if min_periods is None else min_periods
     
+    # Rewrite the string 'quantile' to the engine's configurable 50 percent 
+    # quantile, warning once per call
+    if any(isinstance(func, str) and func == 'quantile' for func in window_func):
+        if engine == 'polars':
+            quantile_func = ('quantile_50', pl_quantile(quantile=0.5))
+            helper, example = "pl_quantile", "('quantile_75', pl_quantile(quantile=0.75))"
+        else:
+            quantile_func = ('quantile_50', pd_quantile(q=0.5))
+            helper, example = "pd_quantile", "('quantile_75', pd_quantile(q=0.75))"
+        warnings.warn(
+            "You passed 'quantile' as a string-based function, so it defaulted to a 50 percent quantile (0.5). "
+            f"For more control over the quantile value, consider using the function `{helper}()`. "
+            f"For example: {example}.",
+            stacklevel=2
+        )
+        window_func = [quantile_func if isinstance(func, str) and func == 'quantile' else func for func in window_func]
+    
+    # Get threads
+    threads = get_threads(threads)
+    
+    # Check the floating point precision
+    if precision not in ('f32', 'f64'):
+        raise ValueError("Invalid precision. Use 'f32' or 'f64'.")
+    
     # Call the function to augment expanding window columns using the specified engine
     if engine == 'pandas':
-        return _augment_expanding_pandas(data, date_column, value_column, window_func, min_periods, **kwargs)
+        return _augment_expanding_pandas(data, date_column, value_column, window_func, min_periods, threads, show_progress, precision, **kwargs)
     elif engine == 'polars':
-        return _augment_expanding_polars(data, date_column, value_column, window_func, min_periods, **kwargs)
+        return _augment_expanding_polars(data, date_column, value_column, window_func, min_periods, precision, **kwargs)
     else:
         raise ValueError("Invalid engine. Use 'pandas' or 'polars'.")
 
@@ -212,108 +274,94 @@ def _augment_expanding_pandas(
     value_column: Union[str, list],  
     window_func: Union[str, list, Tuple[str, Callable]] = 'mean',
     min_periods: Optional[int] = None,
+    threads: int = 1,
+    show_progress: bool = True,
+    precision: str = 'f64',
     **kwargs,
 ) -> pd.DataFrame:
     """
     Augments the given dataframe with expanding calculations using the Pandas library.
     """
     
-    # Create a fresh copy of the data, leaving the original untouched
-    data_copy = data.copy() if isinstance(data, pd.DataFrame) else data.obj.copy()
+    # Floating point type of the new columns
+    dtype = np.float32 if precision == 'f32' else np.float64
+    
+    # Resolve every window function once, rather than for every group and column
+    resolved_funcs = _resolve_pandas_window_funcs(window_func, use_numpy = not kwargs)
+    
+    # Function applying the Series-based expanding window functions to one sorted group
+    func = partial(
+        _expanding_group, 
+        value_column=value_column, 
+        resolved_funcs=resolved_funcs, 
+        min_periods=min_periods, 
+        dtype=dtype,
+        **kwargs
+    )
     
-    # Group data if it's a GroupBy object; otherwise, prepare it for the expanding calculations
     if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy):
-        group_names = data.grouper.names
-        grouped = data_copy.sort_values(by=[*group_names, date_column]).groupby(group_names)
-    else: 
-        group_names = None
-        grouped = [([], data_copy.sort_values(by=[date_column]))]
-    
-    # Apply Series-based expanding window functions
-    result_dfs = []
-    for _, group_df in grouped:
-        for col in value_column:
-            for func in window_func:
-                if isinstance(func, tuple):
-                    # Ensure the tuple is of length 2 and begins with a string
-                    if len(func) != 2:
-                        raise ValueError(f"Expected tuple of length 2, but `window_func` received tuple of length {len(func)}.")
-                    if not isinstance(func[0], str):
-                        raise TypeError(f"Expected first element of tuple to be type 'str', but `window_func` received {type(func[0])}.")
-                
-                    user_func_name, func = func
-                    new_column_name = f"{col}_expanding_{user_func_name}"
-                        
-                    # Try handling a lambda function of the form lambda x: x
-                    if inspect.isfunction(func) and len(inspect.signature(func).parameters) == 1:
-                        try:
-                            # Construct expanding window column
-                            group_df[new_column_name] = group_df[col].expanding(min_periods=min_periods, **kwargs).apply(func, raw=True)
-                        except Exception as e:
-                            raise Exception(f"An error occurred during the operation of the `{user_func_name}` function in Pandas. Error: {e}")
-
-                    # Try handling a configurable function (e.g. pd_quantile)
-                    elif isinstance(func, tuple) and func[0] == 'configurable':
-                        try:
-                            # Configurable function should return 4 objects
-                            _, func_name, default_kwargs, user_kwargs = func
-                        except Exception as e:
-                            raise ValueError(f"Unexpected function format. Expected a tuple with format ('configurable', func_name, default_kwargs, user_kwargs). Received: {func}. Original error: {e}")
-                        
-                        try:
-                            # Define local values that may be required by configurable functions.
-                            # If adding a new configurable function in utils.pandas_helpers that necessitates 
-                            # additional local values, consider updating this dictionary accordingly.
-                            local_values = {}
-                            # Combine local values with user-provided parameters for the configurable function
-                            user_kwargs.update(local_values)
-                            # Update the default configurable parameters (without adding new keys)
-                            default_kwargs = update_dict(default_kwargs, user_kwargs)
-                        except Exception as e:
-                            raise ValueError("Error encountered while updating parameters for the configurable function `{func_name}` passed to `window_func`: {e}")
-                        
-                        try:
-                            # Get the expanding window function 
-                            expanding_function = getattr(group_df[col].expanding(min_periods=min_periods, **kwargs), func_name, None)
-                        except Exception as e:
-                            raise AttributeError(f"The function `{func_name}` tried to access a non-existent attribute or method in Pandas. Error: {e}")
-
-                        if expanding_function:
-                            try:
-                                # Apply expanding function to data and store in new column
-                                group_df[new_column_name] = expanding_function(**default_kwargs)
-                            except Exception as e:
-                                raise Exception(f"Failed to construct the expanding window column using function `{user_func_name}`. Error: {e}")
-                    else:
-                        raise TypeError(f"Unexpected function format for `{user_func_name}`.")
-    
-                elif isinstance(func, str):
-                    new_column_name = f"{col}_expanding_{func}"
-                    # Get the expanding function (like mean, sum, etc.) specified by `func` for the given column and window settings
-                    if func == "quantile":
-                        new_column_name = f"{col}_expanding_{func}_50"
-                        group_df[new_column_name] = group_df[col].expanding(min_periods=min_periods, **kwargs).quantile(q=0.5)
-                        warnings.warn(
-                            "You passed 'quantile' as a string-based function, so it defaulted to a 50 percent quantile (0.5). "
-                            "For more control over the quantile value, consider using the function `pd_quantile()`. "
-                            "For example: ('quantile_75', pd_quantile(q=0.75))."
-                        )
-                    else:
-                        expanding_function = getattr(group_df[col].expanding(min_periods=min_periods, **kwargs), func, None)
-                        # Apply expanding function to data and store in new column
-                        if expanding_function:
-                            group_df[new_column_name] = expanding_function()
-                        else:
-                            raise ValueError(f"Invalid function name: {func}")
-                else:
-                    raise TypeError(f"Invalid function type: {type(func)}")
-                    
-        result_dfs.append(group_df)
+        return _augment_expanding_pandas_grouped(data, date_column, value_column, func, dtype, threads, show_progress)
+    else:
+        return _augment_expanding_pandas_single(data, date_column, value_column, func, dtype)
+
+def _augment_expanding_pandas_single(data, date_column, value_column, func, dtype):
+    """
+    Augments a single (ungrouped) DataFrame: sorts it once by date, computes the 
+    new columns on the sorted values and writes them back in the original order.
+    """
+    # Only the value columns are taken in sorted order
+    (order, sorted_df), = _sorted_groups(data, date_column, columns=value_column)
     
-    # Combine processed dataframes and sort by index
-    result_df = pd.concat(result_dfs).sort_index()  # Sort by the original index
+    new_columns = {}
+    for new_column_name, values in func(sorted_df).items():
+        new_columns[new_column_name] = np.empty(len(data), dtype=dtype)
+        new_columns[new_column_name][order] = values
     
-    return result_df
+    # Attach the new columns to a copy of the original data, leaving the original untouched
+    return data.assign(**new_columns)
+
+def _augment_expanding_pandas_grouped(data, date_column, value_column, func, dtype, threads, show_progress):
+    """
+    Augments a GroupBy object: computes the new columns for each group, in 
+    parallel if `threads` is not 1, and writes them into their original rows.
+    """
+    # Read from the original data; it is only copied once, when the result is assembled
+    frame = data.obj
+    
+    # Only the value columns are taken in sorted order
+    positions_list, group_dfs = zip(*_sorted_groups(data, date_column, columns=value_column))
+    
+    # Check if threads are set to 1. If true, handle it without parallel processing.
+    if threads == 1:
+        group_results_list = [
+            func(group_df) for group_df in conditional_tqdm(
+                group_dfs, 
+                total=len(group_dfs), 
+                desc="Calculating Expanding...", 
+                display=show_progress
+            )
+        ]
+    else:
+        # Prepare to use pathos.multiprocessing
+        pool = ProcessingPool(threads)
+        
+        group_results_list = list(conditional_tqdm(
+            pool.map(func, group_dfs), 
+            total=len(group_dfs), 
+            desc="Calculating Expanding...", 
+            display=show_progress
+        ))
+    
+    new_columns = {}
+    for positions, group_results in zip(positions_list, group_results_list):
+        # Write the group's results straight into their original row positions
+        for new_column_name, values in group_results.items():
+            if new_column_name not in new_columns:
+                new_columns[new_column_name] = np.full(len(frame), np.nan, dtype=dtype)
+            new_columns[new_column_name][positions] = values
+    
+    # Attach the new columns to a copy of the original data, leaving the original untouched
+    return _drop_ungrouped_rows(frame.assign(**new_columns), data)
 
 def _augment_expanding_polars(
     data: Union[pd.DataFrame, pd.core.groupby.generic.DataFrameGroupBy], 
@@ -321,150 +369,66 @@ def _augment_expanding_polars(
     value_column: Union[str, list],  
     window_func: Union[str, list, Tuple[str, Callable]] = 'mean',
     min_periods: Optional[int] = None,
+    precision: str = 'f64',
     **kwargs,
 ) -> pl.DataFrame:
     """
     Augments the given dataframe with expanding calculations using the Polars library.
     """
     
-    # Create a fresh copy of the data, leaving the original untouched
-    data_copy = data.copy() if isinstance(data, pd.DataFrame) else data.obj.copy()
-    
-    # Retrieve the group column names if the input data is a GroupBy object
+    # Retrieve the group column names and the underlying DataFrame. No copy is 
+    # needed, since the conversion to Polars leaves the original untouched
     if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy):
         group_names = data.grouper.names
+        pandas_df = data.obj
     else: 
         group_names = None
-
-    # Convert data into a Pandas DataFrame format for processing
-    if isinstance(data_copy, pd.core.groupby.generic.DataFrameGroupBy):
-        pandas_df = data_copy.apply(lambda x: x)
-    elif isinstance(data_copy, pd.DataFrame):
-        pandas_df = data_copy
-    else:
-        raise ValueError("Data must be a Pandas DataFrame or Pandas GroupBy object.")
+        pandas_df = data
+    
+    # Resolve each function to an expression factory once, rather than per column
+    resolved_funcs = _resolve_polars_window_funcs(window_func, pandas_df.shape[0], min_periods, precision)
     
-    # Initialize lists to store expanding expressions and new column names  
-    expanding_exprs = []
-    new_column_names = []
-
     # Construct expanding expressions for each column and function combination
+    expanding_exprs = []
     for col in value_column:
-        for func in window_func:
+        for func_name, make_expr in resolved_funcs:
+            expanding_expr = make_expr(col).alias(f"{col}_expanding_{func_name}")
             
-            # Handle functions passed as tuples
-            if isinstance(func, tuple):
-                # Ensure the tuple is of length 2 and begins with a string
-                if len(func) != 2:
-                    raise ValueError(f"Expected tuple of length 2, but `window_func` received tuple of length {len(func)}.")
-                if not isinstance(func[0], str):
-                    raise TypeError(f"Expected first element of tuple to be type 'str', but `window_func` received {type(func[0])}.")
-                
-                user_func_name, func = func
-                new_column_name = f"{col}_expanding_{user_func_name}"
-                
-                # Try handling a lambda function of the form lambda x: x
-                if inspect.isfunction(func) and len(inspect.signature(func).parameters) == 1:
-                    try:
-                        # Construct expanding window expression
-                        expanding_expr = pl.col(col) \
-                            .cast(pl.Float64) \
-                            .rolling_apply(
-                                function=func,
-                                window_size=pandas_df.shape[0], 
-                                min_periods=min_periods
-                            )
-                    except Exception as e:
-                        raise Exception(f"An error occurred during the operation of the `{user_func_name}` function in Polars. Error: {e}")
-   
-                # Try handling a configurable function (e.g. pl_quantile) if it is not a lambda function
-                elif isinstance(func, tuple) and func[0] == 'configurable':
-                    try:
-                        # Configurable function should return 4 objects
-                        _, func_name, default_kwargs, user_kwargs = func
-                    except Exception as e:
-                        raise ValueError(f"Unexpected function format. Expected a tuple with format ('configurable', func_name, default_kwargs, user_kwargs). Received: {func}. Original error: {e}")
-                    
-                    try:
-                        # Define local values that may be required by configurable functions.
-                        # If adding a new configurable function in utils.polars_helpers that necessitates 
-                        # additional local values, consider updating this dictionary accordingly.
-                        local_values = {
-                            'window_size': pandas_df.shape[0],
-                            'min_periods': min_periods
-                        }
-                        # Combine local values with user-provided parameters for the configurable function
-                        user_kwargs.update(local_values)
-                        # Update the default configurable parameters (without adding new keys)
-                        default_kwargs = update_dict(default_kwargs, user_kwargs)
-                    except Exception as e:
-                        raise ValueError("Error encountered while updating parameters for the configurable function `{func_name}` passed to `window_func`: {e}")
-                    
-                    try:
-                        # Construct expanding window expression
-                        expanding_expr = getattr(pl.col(col), f"rolling_{func_name}")(**default_kwargs)
-                    except AttributeError as e:
-                        raise AttributeError(f"The function `{user_func_name}` tried to access a non-existent attribute or method in Polars. Error: {e}")
-                    except Exception as e:
-                        raise Exception(f"Error during the execution of `{user_func_name}` in Polars. Error: {e}")
-                
-                else:
-                    raise TypeError(f"Unexpected function format for `{user_func_name}`.")
-                
-                expanding_expr = expanding_expr.alias(new_column_name)
-
-            elif isinstance(func, str):
-                func_name = func
-                new_column_name = f"{col}_expanding_{func_name}"
-                if not hasattr(pl.col(col), f"{func_name}"):
-                    raise ValueError(f"{func_name} is not a recognized function for Polars.")
-                
-                # Construct expanding window expression and handle specific case of 'skew'
-                if func_name == "skew":
-                    expanding_expr = getattr(pl.col(col), f"rolling_{func_name}")(window_size=pandas_df.shape[0])
-                elif func_name == "quantile":
-                        new_column_name = f"{col}_expanding_{func}_50"
-                        expanding_expr = getattr(pl.col(col), f"rolling_{func_name}")(quantile=0.5, window_size=pandas_df.shape[0], min_periods=min_periods, interpolation='midpoint')
-                        warnings.warn(
-                            "You passed 'quantile' as a string-based function, so it defaulted to a 50 percent quantile (0.5). "
-                            "For more control over the quantile value, consider using the function `pl_quantile()`. "
-                            "For example: ('quantile_75', pl_quantile(quantile=0.75))."
-                        )
-                else: 
-                    expanding_expr = getattr(pl.col(col), f"rolling_{func_name}")(window_size=pandas_df.shape[0], min_periods=min_periods)
-
-                expanding_expr = expanding_expr.alias(new_column_name)
-                
-            else:
-                raise TypeError(f"Invalid function type: {type(func)}")
+            # Return every new column in the requested precision
+            if precision == 'f32':
+                expanding_expr = expanding_expr.cast(pl.Float32)
+            
+            # Evaluate the expression within each group, keeping rows in place
+            if group_names:
+                expanding_expr = expanding_expr.over(group_names)
             
-            # Add constructed expressions and new column names to respective lists
             expanding_exprs.append(expanding_expr)
-            new_column_names.append(new_column_name)
-
-    # Convert Pandas DataFrame to Polars and ensure a consistent row order by resetting the index
-    df = pl.from_pandas(pandas_df.reset_index())
-    
-    # Evaluate the accumulated expanding expressions and convert back to a Pandas DataFrame
-    if group_names:
-        df_new_columns = df \
-            .sort(*group_names, date_column) \
-            .group_by(group_names) \
-            .agg(expanding_exprs) \
-            .sort(*group_names) \
-            .explode(new_column_names)
-
-        df = pl.concat([df, df_new_columns.drop(group_names)], how="horizontal") \
-                .sort('index') \
-                .drop('index') \
-                .to_pandas()
-    else:
-        df = df \
-            .sort(date_column) \
-            .with_columns(expanding_exprs) \
-            .sort('index') \
-            .drop('index') \
-            .to_pandas()
+
+    # Only the columns the query reads cross over to Polars, along with the row 
+    # positions used to put the results back in place. rechunk=False skips the 
+    # extra copy into contiguous buffers
+    key_columns = list(dict.fromkeys([*(group_names or []), date_column, *value_column]))
+    lf = pl.from_pandas(pandas_df[key_columns], rechunk=False) \
+        .with_row_count('__row_nr__') \
+        .lazy()
+    
+    # Build the expanding expressions into a single lazy query
+    lf = lf \
+        .sort(*(group_names or []), date_column) \
+        .with_columns(expanding_exprs)
+    
+    # Evaluate the query once and bring back only the new columns, in the original row order
+    new_columns = lf \
+        .sort('__row_nr__') \
+        .select(pl.exclude(['__row_nr__', *key_columns])) \
+        .collect() \
+        .to_pandas()
+    
+    # Attach the new columns and return the rows ordered by the original index
+    df = pandas_df \
+        .assign(**{name: new_columns[name].to_numpy() for name in new_columns.columns}) \
+        .sort_index(kind='stable') \
+        .reset_index(drop=True)
                 
     return df
 
@@ -493,6 +457,12 @@ def augment_expanding_apply(
         The specification can be:
         - A tuple where the first element is a string representing the function's name and the second element is the callable function itself.
         - A list of such tuples for multiple functions.
+        - A tuple whose second element is an incremental function from 
+          `pd_corr(x, y)` or `pd_linear_regression(y, x)`. These are computed 
+          from running sums in a single pass over each group instead of 
+          calling a function on every window, which is much faster on long 
+          groups. `pd_linear_regression` returns the columns 
+          `expanding_{name}_Intercept` and `expanding_{name}_{x}`.
     
         Note: For functions targeting only a single value column without the need for 
         contextual data from other columns, consider using the `augment_expanding` 
@@ -505,8 +475,13 @@ def augment_expanding_apply(
     Returns
     -------
     pd.DataFrame
-        The `augment_expanding` function returns a DataFrame with new columns 
-        for each applied function, window size, and value column.
+        The `augment_expanding_apply` function returns a DataFrame with a new 
+        column `expanding_{name}` for each applied function. Functions that 
+        return a numeric `pd.Series` get one column per field instead, named 
+        `expanding_{name}_{field}`. Numeric scalar results give a float column; 
+        any other result (e.g. a tuple or an array) is kept whole in an object 
+        column. Rows whose group key is missing are dropped when grouping with 
+        `dropna=True` (the default).
         
     Examples
     --------
@@ -579,23 +554,33 @@ def augment_expanding_apply(
         .dropna()
     )
     
-    # Format the results to have each regression output (slope and intercept) in 
-    #  separate columns.
-    regression_wide_df = pd.concat(result_df['expanding_regression'].to_list(), axis=1).T
-    regression_wide_df = pd.concat([result_df.reset_index(drop = True), regression_wide_df], axis=1)
-    display(regression_wide_df)
+    # Each regression output (intercept and slope) is returned in its own column
+    display(result_df)
+    ```
+    
+    ```{python}
+    # The same correlation and regression computed incrementally, from running 
+    # sums, in a single pass over each group
+    from pytimetk.utils.pandas_helpers import pd_corr, pd_linear_regression
+    
+    result_df = (
+        df.groupby('id')
+        .augment_expanding_apply(
+            date_column='date',
+            window_func=[
+                ('corr', pd_corr(x='value1', y='value2')),
+                ('regression', pd_linear_regression(y='value1', x=['value2', 'value3'])),
+            ]
+        )
+    )
+    display(result_df)
     ```
     '''
-    # Create a fresh copy of the data, leaving the original untouched
-    data_copy = data.copy() if isinstance(data, pd.DataFrame) else data.obj.copy()
+    # Read from the original data; it is only copied once, when the result is assembled
+    frame = data.obj if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy) else data
     
     # Group data if it's a GroupBy object; otherwise, prepare it for the expanding calculations
-    if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy):
-        group_names = data.grouper.names
-        grouped = data_copy.sort_values(by=[*group_names, date_column]).groupby(group_names)
-    else: 
-        group_names = None
-        grouped = [([], data_copy.sort_values(by=[date_column]))]
+    grouped = _sorted_groups(data, date_column)
         
      # Set min_periods to 1 if not specified
     min_periods = 1 if min_periods is None else min_periods
@@ -603,36 +588,496 @@ def augment_expanding_apply(
     # Helper function to apply expanding calculations on a dataframe
     def expanding_apply(func, df, min_periods):
         num_rows = len(df)
-        results = [np.nan] * num_rows
+        results = None
+        fields = None
         
-        for end_point in range(1, num_rows + 1):
-            window_df = df.iloc[: end_point]
-            if len(window_df) >= min_periods:
-                results[end_point - 1] = func(window_df)
-
-        return pd.DataFrame({'result': results}, index=df.index)
+        # Windows shorter than min_periods stay NaN, so slicing starts at the 
+        # first window that can produce a value
+        for end_point in range(max(min_periods, 1), num_rows + 1):
+            result = func(df.iloc[: end_point])
+            
+            if results is None:
+                # Allocate a typed array from the first result: a float column for 
+                # numeric scalars, one float column per field of a numeric Series, 
+                # and a single object column for anything else
+                fields = _numeric_fields(result)
+                if fields is not None:
+                    results = np.full((num_rows, len(fields) or 1), np.nan)
+                else:
+                    results = np.full((num_rows, 1), np.nan, dtype=object)
+            
+            # Fall back to an object column when a window returns a result of a 
+            # different type or shape than the first one
+            elif results.dtype != object and _numeric_fields(result) != fields:
+                results = _to_object_results(results, fields, end_point - 1)
+                fields = None
+            
+            if results.dtype == object:
+                results[end_point - 1, 0] = result
+            else:
+                results[end_point - 1] = result
+        
+        # Scalar results have no fields
+        return results, (fields or None)
     
     # Apply DataFrame-based expanding window functions
-    result_dfs = []
-    for _, group_df in grouped:
+    new_columns = {}
+    func_columns = {}
+    for positions, group_df in grouped:
         for func in window_func:
             if isinstance(func, tuple):
                 func_name, func = func
-                new_column_name = f"expanding_{func_name}"
-                group_df[new_column_name] = expanding_apply(func, group_df, min_periods=min_periods)
+                func_columns.setdefault(func_name, [])
+                
+                # Incremental functions (e.g. pd_corr) are computed from running sums
+                if isinstance(func, tuple) and func[0] == 'incremental':
+                    results, fields = _expanding_incremental(func, group_df, min_periods)
+                else:
+                    results, fields = expanding_apply(func, group_df, min_periods=min_periods)
+                if results is None:
+                    continue
+                
+                if fields is None:
+                    names = [f"expanding_{func_name}"]
+                else:
+                    names = [f"expanding_{func_name}_{field}" for field in fields]
+                
+                for j, new_column_name in enumerate(names):
+                    if new_column_name not in new_columns:
+                        new_columns[new_column_name] = np.full(len(frame), np.nan, dtype=results.dtype)
+                        func_columns[func_name].append(new_column_name)
+                    elif results.dtype == object:
+                        # Another group produced typed results; keep the column as objects
+                        new_columns[new_column_name] = new_columns[new_column_name].astype(object)
+                    # Write the group's results straight into their original row positions
+                    new_columns[new_column_name][positions] = results[:, j]
             else:
                 raise TypeError(f"Expected 'tuple', but got invalid function type: {type(func)}")     
-                
-        result_dfs.append(group_df)
     
-    # Combine processed dataframes and sort by index
-    result_df = pd.concat(result_dfs).sort_index()  # Sort by the original index
+    # Order the new columns by function, keeping an empty column for functions 
+    # that never had enough observations
+    result_columns = {}
+    for func_name, names in func_columns.items():
+        if not names:
+            result_columns[f"expanding_{func_name}"] = np.full(len(frame), np.nan)
+        for new_column_name in names:
+            values = new_columns[new_column_name]
+            if values.dtype == object:
+                values = pd.Series(values, index=frame.index).infer_objects()
+            result_columns[new_column_name] = values
+    
+    # Attach the new columns to a copy of the original data, leaving the original untouched
+    result = frame.assign(**result_columns)
     
-    return result_df
+    return _drop_ungrouped_rows(result, data) if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy) else result
 
 # Monkey patch the method to pandas groupby objects
 pd.core.groupby.generic.DataFrameGroupBy.augment_expanding_apply = augment_expanding_apply
 
 
+def _expanding_incremental(func, group_df, min_periods):
+    """
+    Computes an incremental expanding function (see `pd_corr` and 
+    `pd_linear_regression`) for one date-sorted group in a single pass, 
+    returning `(results, fields)` in the same layout as the slice loop in 
+    `augment_expanding_apply`.
+    """
+    try:
+        # Incremental function should return 3 objects
+        _, func_name, func_kwargs = func
+    except Exception as e:
+        raise ValueError(f"Unexpected function format. Expected a tuple with format ('incremental', func_name, func_kwargs). Received: {func}. Original error: {e}")
+    
+    if func_name == 'corr':
+        x = group_df[func_kwargs['x']].to_numpy(dtype=np.float64)
+        y = group_df[func_kwargs['y']].to_numpy(dtype=np.float64)
+        results = _expanding_corr(x, y)[:, None]
+        fields = None
+    elif func_name == 'linear_regression':
+        y = group_df[func_kwargs['y']].to_numpy(dtype=np.float64)
+        X = group_df[func_kwargs['x']].to_numpy(dtype=np.float64)
+        results = _expanding_linear_regression(y, X)
+        fields = ['Intercept', *func_kwargs['x']]
+    else:
+        raise ValueError(f"Invalid incremental function name: {func_name}")
+    
+    # Windows shorter than min_periods stay NaN
+    results[: max(min_periods, 1) - 1] = np.nan
+    
+    return results, fields
+
+def _expanding_corr(x, y):
+    """
+    Expanding Pearson correlation of `x` and `y` from running sums, over the 
+    pairs where both values are present (as `pd.Series.corr`).
+    """
+    valid = ~(np.isnan(x) | np.isnan(y))
+    
+    # Shifting by a constant leaves the correlation unchanged and limits the 
+    # cancellation in the running sums
+    x_shift = x[valid].mean() if valid.any() else 0.0
+    y_shift = y[valid].mean() if valid.any() else 0.0
+    x = np.where(valid, x - x_shift, 0.0)
+    y = np.where(valid, y - y_shift, 0.0)
+    
+    n = np.cumsum(valid)
+    sum_x, sum_y = np.cumsum(x), np.cumsum(y)
+    sum_xx, sum_yy, sum_xy = np.cumsum(x * x), np.cumsum(y * y), np.cumsum(x * y)
+    
+    var_x = n * sum_xx - sum_x * sum_x
+    var_y = n * sum_yy - sum_y * sum_y
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (n * sum_xy - sum_x * sum_y) / np.sqrt(var_x * var_y)
+    
+    # Windows with fewer than 2 pairs or a constant column have no correlation
+    undefined = (n < 2) | (var_x <= 1e-12 * n * sum_xx) | (var_y <= 1e-12 * n * sum_yy)
+    corr[undefined] = np.nan
+    
+    return np.clip(corr, -1.0, 1.0)
+
+def _expanding_linear_regression(y, X):
+    """
+    Expanding least squares fit of `y` on the columns of `X` with an intercept, 
+    from running sums of the centered cross-products. Rows with missing values 
+    are skipped. Returns an array of shape (n, 1 + k) with the intercept 
+    followed by the coefficients; underdetermined windows get the minimum-norm 
+    coefficients, as `sklearn.linear_model.LinearRegression` does.
+    """
+    valid = ~(np.isnan(y) | np.isnan(X).any(axis=1))
+    
+    # Shift by constants to limit cancellation; the intercept is corrected below
+    x_shift = X[valid].mean(axis=0) if valid.any() else np.zeros(X.shape[1])
+    y_shift = y[valid].mean() if valid.any() else 0.0
+    X = np.where(valid[:, None], X - x_shift, 0.0)
+    y = np.where(valid, y - y_shift, 0.0)
+    
+    # Running sums of the observations and their cross-products
+    n = np.cumsum(valid)
+    n_safe = np.maximum(n, 1)[:, None]
+    mean_x = np.cumsum(X, axis=0) / n_safe
+    mean_y = np.cumsum(y) / n_safe[:, 0]
+    sum_xx = np.cumsum(X[:, :, None] * X[:, None, :], axis=0)
+    sum_xy = np.cumsum(X * y[:, None], axis=0)
+    
+    # Solve the centered normal equations of every window at once
+    cov_xx = sum_xx - n_safe[:, :, None] * mean_x[:, :, None] * mean_x[:, None, :]
+    cov_xy = sum_xy - n_safe * mean_x * mean_y[:, None]
+    coef = np.einsum('nij,nj->ni', np.linalg.pinv(cov_xx, rcond=1e-10, hermitian=True), cov_xy)
+    intercept = mean_y + y_shift - np.einsum('ni,ni->n', mean_x + x_shift, coef)
+    
+    results = np.column_stack([intercept, coef])
+    results[n == 0] = np.nan
+    
+    return results
+
+def _numeric_fields(result):
+    """
+    Returns the fields of a numeric expanding result: an empty list for a 
+    numeric scalar, the index of a numeric `pd.Series`, and None for any other 
+    result, which is stored as an object.
+    """
+    if isinstance(result, pd.Series):
+        if len(result) and pd.api.types.is_numeric_dtype(result.dtype) and not pd.api.types.is_bool_dtype(result.dtype):
+            return list(result.index)
+        return None
+    if np.ndim(result) == 0 and np.asarray(result).dtype.kind in 'iuf':
+        return []
+    return None
+
+def _to_object_results(results, fields, num_filled):
+    """
+    Converts the first `num_filled` rows of typed expanding results to a single 
+    object column, rebuilding each row's `pd.Series` when the results have fields.
+    """
+    object_results = np.full((len(results), 1), np.nan, dtype=object)
+    for i in range(num_filled):
+        if np.isnan(results[i]).all():
+            continue
+        object_results[i, 0] = pd.Series(results[i], index=fields) if fields else results[i, 0]
+    return object_results
+
+
+def _expanding_group(group_df, value_column, resolved_funcs, min_periods, dtype=np.float64, **kwargs):
+    """
+    Computes every resolved window function for each value column of a single 
+    group sorted by date. Returns a dictionary of new column names to values. 
+    The cumulative numpy statistics are computed in `dtype`.
+    """
+    group_results = {}
+    for col in value_column:
+        # Build the expanding window once per column and share it across functions
+        expanding = group_df[col].expanding(min_periods=min_periods, **kwargs)
+        
+        # Cumulative numpy statistics share the column's values, counts and sums
+        numpy_cache = {}
+        
+        for kind, func_name, func, func_kwargs in resolved_funcs:
+            new_column_name = f"{col}_expanding_{func_name}"
+            
+            if kind == 'lambda':
+                try:
+                    # Construct expanding window column
+                    group_results[new_column_name] = expanding.apply(func, raw=True)
+                except Exception as e:
+                    raise Exception(f"An error occurred during the operation of the `{func_name}` function in Pandas. Error: {e}")
+            
+            elif kind == 'configurable':
+                try:
+                    # Apply expanding function to data and store in new column
+                    group_results[new_column_name] = func(expanding, **func_kwargs)
+                except Exception as e:
+                    raise Exception(f"Failed to construct the expanding window column using function `{func_name}`. Error: {e}")
+            
+            elif kind == 'numpy':
+                # Cumulative statistics only need a single numpy pass over the column
+                if not numpy_cache:
+                    numpy_cache['values'] = group_df[col].to_numpy(dtype=dtype, na_value=np.nan)
+                group_results[new_column_name] = _expanding_numpy(
+                    func, 
+                    numpy_cache['values'], 
+                    min_periods, 
+                    cache=numpy_cache
+                )
+            
+            else:
+                # Apply expanding function (like mean, sum, etc.) to data and store in new column
+                group_results[new_column_name] = func(expanding, **func_kwargs)
+    
+    return group_results
+
+def _resolve_pandas_window_funcs(window_func, use_numpy=True):
+    """
+    Validates `window_func` and resolves each entry to a tuple of 
+    `(kind, func_name, func, func_kwargs)`, so the group loop in 
+    `_augment_expanding_pandas` only has to branch on `kind`.
+    """
+    resolved_funcs = []
+    for func in window_func:
+        if isinstance(func, tuple):
+            # Ensure the tuple is of length 2 and begins with a string
+            if len(func) != 2:
+                raise ValueError(f"Expected tuple of length 2, but `window_func` received tuple of length {len(func)}.")
+            if not isinstance(func[0], str):
+                raise TypeError(f"Expected first element of tuple to be type 'str', but `window_func` received {type(func[0])}.")
+        
+            user_func_name, func = func
+                
+            # Try handling a lambda function of the form lambda x: x
+            if inspect.isfunction(func) and len(inspect.signature(func).parameters) == 1:
+                resolved_funcs.append(('lambda', user_func_name, func, {}))
+
+            # Try handling a configurable function (e.g. pd_quantile)
+            elif isinstance(func, tuple) and func[0] == 'configurable':
+                try:
+                    # Configurable function should return 4 objects
+                    _, func_name, default_kwargs, user_kwargs = func
+                except Exception as e:
+                    raise ValueError(f"Unexpected function format. Expected a tuple with format ('configurable', func_name, default_kwargs, user_kwargs). Received: {func}. Original error: {e}")
+                
+                try:
+                    # Define local values that may be required by configurable functions.
+                    # If adding a new configurable function in utils.pandas_helpers that necessitates 
+                    # additional local values, consider updating this dictionary accordingly.
+                    local_values = {}
+                    # Combine local values with user-provided parameters for the configurable function
+                    user_kwargs.update(local_values)
+                    # Update the default configurable parameters (without adding new keys)
+                    default_kwargs = update_dict(default_kwargs, user_kwargs)
+                except Exception as e:
+                    raise ValueError(f"Error encountered while updating parameters for the configurable function `{func_name}` passed to `window_func`: {e}")
+                
+                # Get the expanding window function 
+                expanding_function = getattr(pd.core.window.expanding.Expanding, func_name, None)
+                if not callable(expanding_function):
+                    raise AttributeError(f"The function `{func_name}` tried to access a non-existent attribute or method in Pandas.")
+                
+                resolved_funcs.append(('configurable', user_func_name, expanding_function, default_kwargs))
+            else:
+                raise TypeError(f"Unexpected function format for `{user_func_name}`.")
+
+        elif isinstance(func, str):
+            if use_numpy and func in _EXPANDING_NUMPY_FUNCS:
+                resolved_funcs.append(('numpy', func, func, {}))
+            else:
+                # Get the expanding function (like mean, sum, etc.) specified by `func`
+                expanding_function = getattr(pd.core.window.expanding.Expanding, func, None)
+                if not callable(expanding_function):
+                    raise ValueError(f"Invalid function name: {func}")
+                resolved_funcs.append(('method', func, expanding_function, {}))
+        else:
+            raise TypeError(f"Invalid function type: {type(func)}")
+    
+    return resolved_funcs
+
+def _resolve_polars_window_funcs(window_func, window_size, min_periods, precision='f64'):
+    """
+    Validates `window_func` and resolves each entry to a tuple of 
+    `(func_name, make_expr)`, where `make_expr` builds the expanding expression 
+    for a given value column.
+    """
+    def column_expr(col):
+        # Cast to 32-bit floats up front when requested
+        return pl.col(col).cast(pl.Float32) if precision == 'f32' else pl.col(col)
+    
+    resolved_funcs = []
+    for func in window_func:
+        if isinstance(func, tuple):
+            # Ensure the tuple is of length 2 and begins with a string
+            if len(func) != 2:
+                raise ValueError(f"Expected tuple of length 2, but `window_func` received tuple of length {len(func)}.")
+            if not isinstance(func[0], str):
+                raise TypeError(f"Expected first element of tuple to be type 'str', but `window_func` received {type(func[0])}.")
+            
+            user_func_name, func = func
+            
+            # Try handling a lambda function of the form lambda x: x
+            if inspect.isfunction(func) and len(inspect.signature(func).parameters) == 1:
+                def make_expr(col, func=func, user_func_name=user_func_name):
+                    try:
+                        # Construct expanding window expression
+                        return column_expr(col) \
+                            .cast(pl.Float32 if precision == 'f32' else pl.Float64) \
+                            .rolling_apply(
+                                function=func,
+                                window_size=window_size, 
+                                min_periods=min_periods
+                            )
+                    except Exception as e:
+                        raise Exception(f"An error occurred during the operation of the `{user_func_name}` function in Polars. Error: {e}")
+            
+            # Try handling a configurable function (e.g. pl_quantile) if it is not a lambda function
+            elif isinstance(func, tuple) and func[0] == 'configurable':
+                try:
+                    # Configurable function should return 4 objects
+                    _, func_name, default_kwargs, user_kwargs = func
+                except Exception as e:
+                    raise ValueError(f"Unexpected function format. Expected a tuple with format ('configurable', func_name, default_kwargs, user_kwargs). Received: {func}. Original error: {e}")
+                
+                try:
+                    # Define local values that may be required by configurable functions.
+                    # If adding a new configurable function in utils.polars_helpers that necessitates 
+                    # additional local values, consider updating this dictionary accordingly.
+                    local_values = {
+                        'window_size': window_size,
+                        'min_periods': min_periods
+                    }
+                    # Combine local values with user-provided parameters for the configurable function
+                    user_kwargs.update(local_values)
+                    # Update the default configurable parameters (without adding new keys)
+                    default_kwargs = update_dict(default_kwargs, user_kwargs)
+                except Exception as e:
+                    raise ValueError(f"Error encountered while updating parameters for the configurable function `{func_name}` passed to `window_func`: {e}")
+                
+                if not hasattr(pl.Expr, f"rolling_{func_name}"):
+                    raise AttributeError(f"The function `{user_func_name}` tried to access a non-existent attribute or method in Polars.")
+                
+                def make_expr(col, func_name=func_name, func_kwargs=default_kwargs):
+                    # Construct expanding window expression
+                    return getattr(column_expr(col), f"rolling_{func_name}")(**func_kwargs)
+            
+            else:
+                raise TypeError(f"Unexpected function format for `{user_func_name}`.")
+            
+            resolved_funcs.append((user_func_name, make_expr))
+        
+        elif isinstance(func, str):
+            func_name = func
+            if not hasattr(pl.Expr, f"{func_name}"):
+                raise ValueError(f"{func_name} is not a recognized function for Polars.")
+            
+            # Construct expanding window expression and handle specific case of 'skew'
+            if func_name == "skew":
+                def make_expr(col):
+                    return pl.col(col).rolling_skew(window_size=window_size)
+            elif func_name in ("std", "var"):
+                # Sums of squares lose too much precision in 32-bit floats, 
+                # so these are always computed in 64-bit floats
+                def make_expr(col, func_name=func_name):
+                    return getattr(pl.col(col), f"rolling_{func_name}")(window_size=window_size, min_periods=min_periods)
+            else: 
+                def make_expr(col, func_name=func_name):
+                    return getattr(column_expr(col), f"rolling_{func_name}")(window_size=window_size, min_periods=min_periods)
+            
+            resolved_funcs.append((func_name, make_expr))
+        
+        else:
+            raise TypeError(f"Invalid function type: {type(func)}")
+    
+    return resolved_funcs
+
+_EXPANDING_NUMPY_FUNCS = ('sum', 'mean', 'min', 'max', 'count')
+
+def _expanding_numpy(func, values, min_periods, cache=None):
+    """
+    Computes an expanding `sum`, `mean`, `min`, `max` or `count` with 
+    cumulative numpy operations. Like `pandas.Series.expanding`, missing 
+    values are skipped and windows with fewer than `min_periods` observations 
+    are NaN. Passing the same `cache` dictionary for several functions on the 
+    same values reuses the running counts and sums between them.
+    """
+    cache = {} if cache is None else cache
+    
+    if 'count' not in cache:
+        cache['valid'] = ~np.isnan(values)
+        cache['count'] = np.cumsum(cache['valid'])
+    valid, count = cache['valid'], cache['count']
+    
+    if func in ('sum', 'mean') and 'sum' not in cache:
+        cache['sum'] = np.cumsum(np.where(valid, values, 0.0))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if func == 'count':
+            result = count.astype(values.dtype)
+        elif func == 'sum':
+            result = cache['sum'].copy()
+        elif func == 'mean':
+            result = (cache['sum'] / count).astype(values.dtype, copy=False)
+        elif func == 'min':
+            result = np.fmin.accumulate(values)
+        else:
+            result = np.fmax.accumulate(values)
+    
+    # pandas applies min_periods to the window length for count, and to the 
+    # number of observations for every other statistic
+    if func == 'count':
+        result[np.arange(1, len(values) + 1) < min_periods] = np.nan
+    else:
+        result[count < min_periods] = np.nan
+    
+    return result
 
+def _sorted_groups(data, date_column, columns=None):
+    """
+    Yields each group's original row positions, sorted by the date column, 
+    alongside the group's rows (restricted to `columns`, if given) in that 
+    order, so results can be written back without a concat and sort_index.
+    """
+    frame = data.obj if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy) else data
+    
+    dates = frame[date_column].to_numpy(dtype='datetime64[ns]')
+    
+    if columns is not None:
+        frame = frame[columns]
+    
+    # Reuse the caller's grouping and only sort the dates within each group, 
+    # rather than sorting the whole frame and grouping it again
+    if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy):
+        for idx in data.indices.values():
+            order = idx[np.argsort(dates[idx], kind='stable')]
+            yield order, frame.take(order)
+    else:
+        order = np.argsort(dates, kind='stable')
+        yield order, frame.take(order)
 
+def _drop_ungrouped_rows(result, data):
+    """
+    Drops the rows that belong to no group of the GroupBy object `data`, i.e. 
+    rows with a missing group key when grouping with `dropna=True` (the pandas 
+    default), as grouping the data again and concatenating the groups did.
+    """
+    positions = np.concatenate(list(data.indices.values())) if data.indices else np.array([], dtype=np.intp)
+    
+    if len(positions) == len(result):
+        return result
+    
+    return result.take(np.sort(positions))
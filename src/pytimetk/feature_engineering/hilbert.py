@@ -2,19 +2,25 @@ import numpy as np
 import pandas as pd
 import pandas_flavor as pf
 import polars as pl
+import scipy.fft as sfft
 from typing import Union, List
+from concurrent.futures import ThreadPoolExecutor
 from pytimetk.utils.checks import check_dataframe_or_groupby, check_date_column, check_value_column
 
 from pytimetk.utils.pandas_helpers import flatten_multiindex_column_names
 from pytimetk.utils.checks import check_dataframe_or_groupby, check_date_column, check_value_column
 from pytimetk.utils.polars_helpers import pandas_to_polars_frequency, pandas_to_polars_aggregation_mapping
+from pytimetk.utils.parallel_helpers import get_threads
 
 @pf.register_dataframe_method
 def augment_hilbert(
     data: Union[pd.DataFrame, pd.core.groupby.generic.DataFrameGroupBy],
     date_column: str, 
     value_column: Union[str, List[str]], 
-    engine: str = 'pandas'):
+    engine: str = 'pandas',
+    threads: int = 1,
+    precision: str = 'f64',
+    fft_backend: str = 'scipy'):
 
     """
     Apply the Hilbert transform to specified columns of a DataFrame or 
@@ -37,6 +43,33 @@ def augment_hilbert(
         - When "polars", the function will internally use the `polars` library 
         for summarizing the data. This can be faster than using "pandas" for 
         large datasets. 
+        
+        - When "cuda", the data is handled with "pandas" and the Fourier 
+        transforms run on the GPU through the optional `cupy` package. Only 
+        the value columns are copied to the device. This pays off for very 
+        long signals (roughly more than 2^16 rows per group).
+    threads : int, optional, default 1
+        Number of threads used for the Fourier transforms. Groups of 
+        different lengths are transformed concurrently, and groups of equal 
+        length share a batched FFT split across `scipy.fft` workers. Set to 
+        -1 to use all available CPU cores.
+    precision : str, optional, default 'f64'
+        Floating point precision of the Fourier transforms and of the new 
+        columns.
+        
+        The options are:
+            - "f64" (default): 64-bit floats.
+            - "f32": 32-bit floats. This runs single precision FFTs, which 
+              are faster and use half the memory, and the new columns are 
+              returned as `float32`.
+    fft_backend : str, optional, default 'scipy'
+        The FFT implementation used for the transforms.
+        
+        - "scipy" (default): `scipy.fft`'s built-in pocketfft.
+        
+        - "pyfftw": FFTW through the optional `pyfftw` package, with its plan 
+        cache enabled. Repeated calls with the same signal lengths reuse the 
+        FFTW plans, which can be faster on long signals.
     
     Returns
     -------
@@ -140,13 +173,47 @@ def augment_hilbert(
     check_dataframe_or_groupby(data)
     check_value_column(data, value_column)
     check_date_column(data, date_column)
+    
+    # Convert string value column to list for consistency
+    if isinstance(value_column, str):
+        value_column = [value_column]
+    
+    # Get the number of FFT workers
+    threads = get_threads(threads)
+    
+    # Check the floating point precision
+    if precision not in ('f32', 'f64'):
+        raise ValueError("Invalid precision. Use 'f32' or 'f64'.")
         
-    if engine == 'pandas':
-        return _augment_hilbert_pandas(data, date_column, value_column)
-    elif engine == 'polars':
-        return _augment_hilbert_polars(data, date_column, value_column)
+    # Select the FFT backend; the "cuda" engine always runs its FFTs with cupy
+    if fft_backend == 'scipy':
+        backend = 'scipy'
+    elif fft_backend == 'pyfftw':
+        try:
+            import pyfftw
+            import pyfftw.interfaces.scipy_fft
+        except ImportError:
+            raise ImportError("The 'pyfftw' package is not installed. Please install it by running 'pip install pyfftw'.")
+        # Keep the FFTW plans between calls
+        pyfftw.interfaces.cache.enable()
+        backend = pyfftw.interfaces.scipy_fft
     else:
-        raise ValueError("Invalid engine. Use 'pandas' or 'polars'.")
+        raise ValueError("Invalid fft_backend. Use 'scipy' or 'pyfftw'.")
+    
+    if engine not in ('pandas', 'polars', 'cuda'):
+        raise ValueError("Invalid engine. Use 'pandas', 'polars' or 'cuda'.")
+    
+    if engine == 'cuda':
+        try:
+            import cupy
+        except ImportError:
+            raise ImportError("The 'cupy' package is not installed. Please install it by running 'pip install cupy'.")
+        backend = 'cuda'
+    
+    if engine == 'polars':
+        return _augment_hilbert_polars(data, date_column, value_column, threads, precision, backend)
+    else:
+        return _augment_hilbert_pandas(data, date_column, value_column, threads, precision, backend)
 # Monkey-patch the method to the DataFrameGroupBy class
 pd.core.groupby.DataFrameGroupBy.augment_hilbert = augment_hilbert
 
@@ -155,143 +222,163 @@ def _augment_hilbert_pandas(
     data: Union[pd.DataFrame, pd.core.groupby.generic.DataFrameGroupBy], 
     date_column: str,
     value_column: Union[str, List[str]], 
+    threads: int = 1,
+    precision: str = 'f64',
+    backend = 'scipy',
                             ):
-    # Type checks
-    # if not isinstance(data, (pd.DataFrame, pd.core.groupby.generic.DataFrameGroupBy)):
-    #     raise TypeError("Input must be a pandas DataFrame or DataFrameGroupBy object")
-    if not isinstance(value_column, list) or not all(isinstance(col, str) for col in value_column):
-        raise TypeError("value_column must be a list of strings")
-
-    # If 'data' is a DataFrame, convert it to a groupby object with a dummy group
+    # The value columns are validated once in `augment_hilbert`
+    
+    # If 'data' is a DataFrame, treat it as a single group sorted by date
     if isinstance(data, pd.DataFrame):
-        if any(col not in data.columns for col in value_column):
-            missing_cols = [col for col in value_column if col not in data.columns]
-            raise KeyError(f"Columns {missing_cols} do not exist in the DataFrame")
-        #data = data.groupby(np.zeros(len(data))).sort(by=date_column)
-        data = data.sort_values(by=date_column)
-        data = data.groupby(np.zeros(len(data)))
-
+        df_sorted = data.sort_values(by=date_column).reset_index(drop=True)
+        starts, lengths = np.zeros(1, dtype=np.int64), np.array([len(df_sorted)])
+    
+    # Otherwise sort once by group and date. Rows with missing group keys are 
+    # dropped, as the groupby does
+    else:
+        frame = data.obj
+        codes = data.ngroup().to_numpy()
+        order = np.lexsort((frame[date_column].to_numpy(dtype='datetime64[ns]'), codes))
+        order = order[codes[order] >= 0]
+        df_sorted = frame.take(order).reset_index(drop=True)
+        
+        # Find the slice of each group in the sorted data
+        starts, lengths = _group_slices(codes[order])
     
-    # Function to apply Hilbert transform to each group
-    def apply_hilbert(group):
-        for col in value_column:
-            # Ensure the column exists in the DataFrame
-            if col not in group.columns:
-                raise KeyError(f"Column '{col}' does not exist in the group")
-
-            # Get the signal from the DataFrame
-            signal = group[col].values
-
-            # Compute the FFT of the signal
-            N = signal.size
-            Xf = np.fft.fft(signal)
-            
-            # Create a zero-phase version of the signal with the negative 
-            # frequencies zeroed out
-            h = np.zeros(N)
-            if N % 2 == 0:
-                h[0] = h[N // 2] = 1
-                h[1:N // 2] = 2
-            else:
-                h[0] = 1
-                h[1:(N + 1) // 2] = 2
-
-            Xf *= h
-            
-            # Perform the inverse FFT
-            x_analytic = np.fft.ifft(Xf)
-            
-            # Update the DataFrame
-            group[f'{col}_hilbert_real'] = np.real(x_analytic)
-            group[f'{col}_hilbert_imag'] = np.imag(x_analytic)
-        return group
-
-    # Apply the Hilbert transform to each group and concatenate the results
-    df_hilbert = pd.concat((apply_hilbert(group) for _, group in data), ignore_index=True)
+    # Compute the Hilbert transform into new columns
+    new_columns = {}
+    dtype = np.float32 if precision == 'f32' else np.float64
+    for col in value_column:
+        signal = df_sorted[col].to_numpy(dtype=dtype, copy=True)
+        
+        new_columns[f'{col}_hilbert_real'] = signal
+        new_columns[f'{col}_hilbert_imag'] = _hilbert_imag_groups(signal, starts, lengths, threads, backend)
+    
+    # Attach all the new columns at once
+    df_hilbert = df_sorted.assign(**new_columns)
 
     return df_hilbert
 
 
+def _group_slices(codes):
+    """
+    Returns the start and the length of each run of equal group codes in 
+    sorted data.
+    """
+    starts = np.flatnonzero(np.diff(codes, prepend=-1))
+    lengths = np.diff(np.append(starts, len(codes)))
+    return starts, lengths
+
+
+def _hilbert_imag_groups(signal, starts, lengths, threads=1, backend='scipy'):
+    """
+    Computes the Hilbert transform of each group slice of `signal`. Groups of 
+    equal length are gathered into one 2D array and transformed in a batched 
+    FFT.
+    """
+    x_imag = np.empty_like(signal)
+    
+    # Each length bucket writes to its own rows of `x_imag`
+    def transform_bucket(N, workers):
+        bucket_starts = starts[lengths == N]
+        
+        # Back-to-back groups (e.g. a single group, or data where every group 
+        # has the same length) are reshaped as a view, without copying them
+        first, end = bucket_starts[0], bucket_starts[-1] + N
+        if end - first == N * len(bucket_starts):
+            x_imag[first:end] = _hilbert_imag(signal[first:end].reshape(-1, N), workers, backend).ravel()
+        else:
+            rows = bucket_starts[:, None] + np.arange(N)
+            x_imag[rows] = _hilbert_imag(signal[rows], workers, backend)
+    
+    buckets = np.unique(lengths[lengths > 0])
+    
+    # scipy.fft releases the GIL, so several buckets run on a thread pool with 
+    # one FFT worker each. A single bucket splits its batch across the workers
+    if threads > 1 and len(buckets) > 1 and backend != 'cuda':
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda N: transform_bucket(N, 1), buckets))
+    else:
+        for N in buckets:
+            transform_bucket(N, threads)
+    
+    return x_imag
+
+
+def _hilbert_imag(signals, threads=1, backend='scipy'):
+    """
+    Computes the Hilbert transform (the imaginary part of the analytic signal) 
+    of each row of `signals` along the last axis. The transform keeps the 
+    precision of `signals`. `backend` is a `scipy.fft` backend, or "cuda" to 
+    run the FFTs on the GPU with `cupy` and copy the result back to the host.
+    """
+    # The real part of the analytic signal is the signal itself, so only its 
+    # Hilbert transform is computed. The real FFT covers the non-negative 
+    # frequencies only
+    N = signals.shape[-1]
+    if backend == 'cuda':
+        import cupy as cp
+        Xr = cp.fft.rfft(cp.asarray(signals), axis=-1)
+    else:
+        # The backend only applies to this call; scipy's global backend is left as is
+        with sfft.set_backend(backend):
+            Xr = sfft.rfft(signals, axis=-1, workers=threads)
+    
+    # Rotate the positive frequencies by -90 degrees and zero the DC (and, for 
+    # even N, Nyquist) terms
+    Xr *= -1j
+    Xr[..., 0] = 0
+    if N % 2 == 0:
+        Xr[..., -1] = 0
+    
+    # Perform the inverse real FFT
+    if backend == 'cuda':
+        return cp.asnumpy(cp.fft.irfft(Xr, n=N, axis=-1))
+    with sfft.set_backend(backend):
+        return sfft.irfft(Xr, n=N, axis=-1, workers=threads, overwrite_x=True)
+
+
 def _augment_hilbert_polars(    
     data: Union[pd.DataFrame, pd.core.groupby.generic.DataFrameGroupBy], 
     date_column: str,
     value_column: Union[str, List[str]], 
+    threads: int = 1,
+    precision: str = 'f64',
+    backend = 'scipy',
 ):
-    
-
-        # Function to apply Hilbert transform
-    def apply_hilbert(pl_df):
-        
-        for col in value_column:
-            # Compute the Hilbert transform
-            signal = pl_df[col].to_numpy()
-            N = signal.size
-            Xf = np.fft.fft(signal)
-            
-            # Create a zero-phase version of the signal with the negative frequencies zeroed out
-            h = np.zeros(N)
-            if N % 2 == 0:
-                h[0] = h[N // 2] = 1
-                h[1:N // 2] = 2
-            else:
-                h[0] = 1
-                h[1:(N + 1) // 2] = 2
-
-            Xf *= h
-
-            # Perform the inverse FFT
-            x_analytic = np.fft.ifft(Xf)
-            
-            # Convert numpy arrays to Polars Series and add the Hilbert columns to the Polars DataFrame
-            real_series = pl.Series(f'{col}_hilbert_real', np.real(x_analytic))
-            imag_series = pl.Series(f'{col}_hilbert_imag', np.imag(x_analytic))
-
-            pl_df = pl_df.with_columns(real_series).with_columns(imag_series)
-        return pl_df
 
     # Check if the input data is a DataFrame or a GroupBy object
-    grouped = False
     if isinstance(data, pd.core.groupby.generic.DataFrameGroupBy):
-        grouped = True
         # Extract names from groupby object
         groups = data.grouper.names  # This can be a list of group names
 
-        # Convert the GroupBy object into a Polars DataFrame
-        df_pl = (
-            pl.from_pandas(data.apply(lambda x: x))
-                 .groupby(groups, maintain_order=True)
-                 .agg(pl.all().sort_by(date_column))
-        )
-
-        # Create a list of column names to explode
-        columns_to_explode = [col for col in df_pl.columns if col not in groups]
-
-        # Explode the selected columns
-        exploded_df = df_pl.explode(columns=columns_to_explode)
-        
-        #df_temp = pl.DataFrame(data)
-        # Group by groups and date
+        # Convert the underlying DataFrame to Polars and sort it by group and date
         data = (
-            exploded_df
-                #.select(groups + [date_column] + value_column)
-                #.select(pl.all() )
-                #.with_columns(pl.col(date_column))
-                .sort(*groups ,date_column)
-                #.groupby(groups + [date_column], maintain_order=True)
-                #.agg(pl.all().flatten())
-                #.sort(groups + [date_column])
-                #.explode(columns_to_explode)
+            pl.from_pandas(data.obj)
+                 .sort(*groups, date_column)
         )
-        grouped = data.groupby(groups)
-        result_pl_df = grouped.apply(apply_hilbert)
+        
+        # Find the slice of each group from the runs of equal group keys
+        codes = data.select(pl.struct(groups).rle_id()).to_series().to_numpy()
+        starts, lengths = _group_slices(codes)
         
     else:
         data = (
             pl.from_pandas(data)
                  .sort(date_column)
         )
-        result_pl_df = apply_hilbert(data)
-
+        starts, lengths = np.zeros(1, dtype=np.int64), np.array([data.height])
+    
+    # Compute the Hilbert transform for all groups at once
+    dtype = np.float32 if precision == 'f32' else np.float64
+    hilbert_series = []
+    for col in value_column:
+        signal = np.ascontiguousarray(data[col].to_numpy(), dtype=dtype)
+        
+        hilbert_series.append(pl.Series(f'{col}_hilbert_real', signal))
+        hilbert_series.append(pl.Series(f'{col}_hilbert_imag', _hilbert_imag_groups(signal, starts, lengths, threads, backend)))
+    
+    result_pl_df = data.with_columns(hilbert_series)
 
     # Convert the Polars DataFrame back to a Pandas DataFrame
     result_pd_df = result_pl_df.to_pandas()                               
@@ -129,6 +129,30 @@ def pd_quantile(**kwargs):
     return func_type, func_name, default_kwargs, kwargs
 
 
+
+def pd_corr(x, y):
+    """Generates configuration for the incremental expanding correlation of columns `x` and `y` in `augment_expanding_apply`."""
+    # Designate this function as an 'incremental' type - this helps 'augment_expanding_apply' 
+    # compute it from running sums instead of re-evaluating every window
+    func_type = 'incremental'
+    # Specify the incremental kernel to be called
+    func_name = 'corr'
+    func_kwargs = {'x': x, 'y': y}
+    
+    return func_type, func_name, func_kwargs
+
+
+def pd_linear_regression(y, x):
+    """Generates configuration for the incremental expanding linear regression (with intercept) of column `y` on the column(s) `x` in `augment_expanding_apply`."""
+    # Designate this function as an 'incremental' type - this helps 'augment_expanding_apply' 
+    # compute it from running sums instead of re-evaluating every window
+    func_type = 'incremental'
+    # Specify the incremental kernel to be called
+    func_name = 'linear_regression'
+    func_kwargs = {'y': y, 'x': [x] if isinstance(x, str) else list(x)}
+    
+    return func_type, func_name, func_kwargs
+
 def update_dict(d1, d2):
     """
     Update values in dictionary `d1` based on matching keys from dictionary `d2`.
@@ -1,7 +1,12 @@
 import pytimetk as tk
 import pandas as pd
+import numpy as np
 import pytest
 
+from pytimetk.core.anomalize import _iqr_core, _iqr_numpy, _fast_seasonal_decompose
+
+from statsmodels.tsa.seasonal import seasonal_decompose
+
 from itertools import product
 
 threads = [1, 2]
@@ -89,4 +94,255 @@ def test_02_ungrouped_anomalize(threads, method):
     assert expected_colnames == list(anomalize_df.columns)
     
 
-    
\ No newline at end of file
+def _anomalize_by_group(df, **kwargs):
+    
+    # Reference result: each group anomalized on its own
+    return pd.concat([
+        group.drop('id', axis=1).anomalize("Date", "Weekly_Sales", **kwargs)
+        for _, group in df.groupby('id')
+    ])
+
+value_dtypes = [float, int]
+combinations = list(product(methods, value_dtypes))
+
+@pytest.mark.parametrize("method, value_dtype", combinations)
+def test_03_grouped_matches_single_anomalize(method, value_dtype):
+    
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales"]]
+    
+    df['Weekly_Sales'] = df['Weekly_Sales'].astype(value_dtype)
+    
+    anomalize_df = (
+        df
+            .groupby('id') 
+            .anomalize(
+                "Date", "Weekly_Sales", 
+                period = 52, 
+                trend = 52, 
+                method = method,
+                show_progress = False,
+            ) 
+    )
+    
+    expected_df = _anomalize_by_group(df, period = 52, trend = 52, method = method)
+    
+    pd.testing.assert_frame_equal(anomalize_df.drop('id', axis=1), expected_df)
+
+unequal_threads = [1, 2]
+unequal_combinations = list(product(unequal_threads, methods))
+
+@pytest.mark.parametrize("threads, method", unequal_combinations)
+def test_04_grouped_unequal_lengths_anomalize(threads, method):
+    
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales"]]
+    
+    df = df.groupby('id').apply(lambda x: x.iloc[:-1] if x.name == '1_1' else x).reset_index(drop=True)
+
+    anomalize_df = (
+        df
+            .groupby('id') 
+            .anomalize(
+                "Date", "Weekly_Sales", 
+                period = 52, 
+                trend = 52, 
+                method = method,
+                threads = threads, 
+                show_progress = False,
+            ) 
+    )
+    
+    expected_df = _anomalize_by_group(df, period = 52, trend = 52, method = method)
+    
+    pd.testing.assert_frame_equal(anomalize_df.drop('id', axis=1), expected_df)
+
+@pytest.mark.parametrize("method", methods)
+def test_05_grouped_mixed_frequencies_anomalize(method):
+    
+    # Same length, different frequencies: inferred period and trend differ by group
+    rng = np.random.default_rng(42)
+    
+    df = pd.concat([
+        pd.DataFrame({
+            'id': 'a',
+            'Date': pd.date_range('2020-01-01', periods=200, freq='D'),
+        }),
+        pd.DataFrame({
+            'id': 'b',
+            'Date': pd.date_range('2000-01-01', periods=200, freq='MS'),
+        }),
+    ], ignore_index=True)
+    
+    df['Weekly_Sales'] = rng.standard_normal(len(df)).cumsum() + 100
+    
+    anomalize_df = (
+        df
+            .groupby('id') 
+            .anomalize(
+                "Date", "Weekly_Sales", 
+                method = method,
+                show_progress = False,
+            ) 
+    )
+    
+    expected_df = _anomalize_by_group(df, method = method)
+    
+    pd.testing.assert_frame_equal(anomalize_df.drop('id', axis=1), expected_df)
+
+@pytest.mark.parametrize("threads, method", unequal_combinations)
+def test_06_grouped_unequal_lengths_inferred_frequency_anomalize(threads, method):
+    
+    # Groups sharing dates reuse the inferred period and trend
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales"]]
+    
+    df = df.groupby('id').apply(lambda x: x.iloc[:-1] if x.name == '1_1' else x).reset_index(drop=True)
+
+    anomalize_df = (
+        df
+            .groupby('id') 
+            .anomalize(
+                "Date", "Weekly_Sales", 
+                method = method,
+                threads = threads, 
+                show_progress = False,
+            ) 
+    )
+    
+    expected_df = _anomalize_by_group(df, method = method)
+    
+    pd.testing.assert_frame_equal(anomalize_df.drop('id', axis=1), expected_df)
+
+bind_lengths = ["equal", "unequal"]
+combinations = list(product(bind_lengths, methods))
+
+@pytest.mark.parametrize("lengths, method", combinations)
+def test_07_grouped_bind_data_anomalize(lengths, method):
+    
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales", "IsHoliday"]]
+    
+    if lengths == "unequal":
+        df = df.groupby('id').apply(lambda x: x.iloc[:-1] if x.name == '1_1' else x).reset_index(drop=True)
+    
+    anomalize_df = (
+        df
+            .groupby('id') 
+            .anomalize(
+                "Date", "Weekly_Sales", 
+                period = 52, 
+                trend = 52, 
+                method = method,
+                bind_data = True,
+                show_progress = False,
+            ) 
+    )
+    
+    expected_df = _anomalize_by_group(df, period = 52, trend = 52, method = method, bind_data = True)
+    
+    assert list(anomalize_df.columns[:4]) == ['id', 'Date', 'Weekly_Sales', 'IsHoliday']
+    
+    pd.testing.assert_frame_equal(anomalize_df.drop('id', axis=1), expected_df)
+
+grouped = [False, True]
+combinations = list(product(grouped, methods))
+
+@pytest.mark.parametrize("grouped, method", combinations)
+def test_08_anomaly_as_boolean(grouped, method):
+    
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales"]]
+    
+    if grouped:
+        data = df.groupby('id')
+    else:
+        data = df.query("id == '1_1'").drop('id', axis=1)
+    
+    kwargs = dict(period = 52, trend = 52, method = method, clean = "linear")
+    
+    string_df = data.anomalize("Date", "Weekly_Sales", **kwargs)
+    
+    bool_df = data.anomalize("Date", "Weekly_Sales", anomaly_as_string = False, **kwargs)
+    
+    assert bool_df['anomaly'].dtype == bool
+    
+    pd.testing.assert_series_equal(bool_df['anomaly'], string_df['anomaly'] == "Yes")
+    
+    pd.testing.assert_frame_equal(bool_df.drop('anomaly', axis=1), string_df.drop('anomaly', axis=1))
+
+@pytest.mark.parametrize("iqr_core", [_iqr_core, _iqr_numpy])
+def test_09_iqr_core_matches_percentile(iqr_core):
+    
+    rng = np.random.default_rng(123)
+    
+    # Odd and even lengths hit different quantile interpolation cases
+    for n_obs in [143, 144, 7]:
+        
+        remainder = rng.standard_normal((n_obs, 5))
+        remainder[0, :] = 10
+        
+        score, direction, outlier, limit_l1, limit_l2 = iqr_core(remainder, 0.05)
+        
+        q1, q3 = np.percentile(remainder, [25, 75], axis=0)
+        iq_range = q3 - q1
+        expected_l1 = -1*(q1 + (0.15 / 0.05) * iq_range)
+        expected_l2 = q3 + (0.15 / 0.05) * iq_range
+        expected_direction = np.where(
+            remainder > expected_l2, 1, np.where(remainder < expected_l1, -1, 0)
+        )
+        
+        np.testing.assert_allclose(limit_l1, expected_l1)
+        np.testing.assert_allclose(limit_l2, expected_l2)
+        np.testing.assert_allclose(score, np.abs(remainder - (expected_l1 + expected_l2) / 2))
+        np.testing.assert_array_equal(direction, expected_direction)
+        np.testing.assert_array_equal(outlier, expected_direction != 0)
+
+decomps = ["additive", "multiplicative"]
+periods = [7, 12, 52]
+combinations = list(product(decomps, periods))
+
+@pytest.mark.parametrize("decomp, period", combinations)
+def test_10_fast_seasonal_decompose_matches_statsmodels(decomp, period):
+    
+    rng = np.random.default_rng(123)
+    
+    x = rng.random((143, 3)) + np.linspace(1, 5, 143)[:, None]
+    
+    trend, seasonal = _fast_seasonal_decompose(x, period=period, model=decomp)
+    
+    expected = seasonal_decompose(x, period=period, model=decomp, extrapolate_trend='freq')
+    
+    np.testing.assert_allclose(trend, expected.trend)
+    np.testing.assert_allclose(seasonal, expected.seasonal)
+    
+    # 1-D series
+    trend, seasonal = _fast_seasonal_decompose(x[:, 0], period=period, model=decomp)
+    
+    np.testing.assert_allclose(trend, expected.trend[:, 0])
+    np.testing.assert_allclose(seasonal, expected.seasonal[:, 0])
+
+@pytest.mark.parametrize("grouped, method", list(product(grouped, methods)))
+def test_11_float32_anomalize(grouped, method):
+    
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales"]]
+    
+    if grouped:
+        data = df.groupby('id')
+    else:
+        data = df.query("id == '1_1'").drop('id', axis=1)
+    
+    kwargs = dict(period = 52, trend = 52, method = method)
+    
+    float64_df = data.anomalize("Date", "Weekly_Sales", **kwargs)
+    
+    float32_df = data.anomalize("Date", "Weekly_Sales", precision = 'f32', **kwargs)
+    
+    assert float32_df['seasadj'].dtype == np.float32
+    
+    pd.testing.assert_series_equal(float32_df['observed'], float64_df['observed'])
+    
+    for column in ['seasonal', 'seasadj', 'trend', 'remainder']:
+        np.testing.assert_allclose(float32_df[column], float64_df[column], rtol=1e-3, atol=1e-1)
+
+def test_12_invalid_precision_anomalize():
+    
+    df = tk.load_dataset("walmart_sales_weekly", parse_dates=["Date"])[["id", "Date", "Weekly_Sales"]]
+    
+    with pytest.raises(ValueError):
+        df.groupby('id').anomalize("Date", "Weekly_Sales", precision = 'f16')
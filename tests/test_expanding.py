@@ -0,0 +1,267 @@
+import pytest
+import pandas as pd
+import numpy as np
+import pytimetk as tk
+import warnings
+
+from pytimetk.feature_engineering.expanding import _expanding_numpy
+from pytimetk.utils.pandas_helpers import pd_corr, pd_linear_regression
+
+from itertools import product
+
+# Generate sample data for testing
+def generate_data(num_groups=3, num_entries_per_group=30):
+    np.random.seed(42)
+    date_rng = pd.date_range(start='2020-01-01', freq='D', periods=num_entries_per_group)
+    data = []
+    for i in range(num_groups):
+        group_df = pd.DataFrame({
+            'date': date_rng,
+            'value': np.random.randn(num_entries_per_group).cumsum() + 50,
+            'value2': np.random.randint(0, 20, num_entries_per_group),
+            'group': f'group_{i}'
+        })
+        data.append(group_df)
+    # Shuffle the rows so the functions have to restore the original order
+    return pd.concat(data, ignore_index=True).sample(frac=1, random_state=1)
+
+@pytest.fixture
+def sample_data():
+    return generate_data()
+
+def _expected_expanding_apply(df, func, min_periods):
+    df = df.sort_values('date')
+    results = [
+        func(df.iloc[:i]) if i >= min_periods else np.nan
+        for i in range(1, len(df) + 1)
+    ]
+    return pd.Series(results, index=df.index, dtype='float64')
+
+@pytest.mark.parametrize("min_periods, grouped", product([None, 1, 5], [False, True]))
+def test_augment_expanding_apply(sample_data, min_periods, grouped):
+
+    func = lambda x: x['value'].corr(x['value2'])
+
+    data = sample_data.groupby('group') if grouped else sample_data.query("group == 'group_0'")
+
+    result = data.augment_expanding_apply(
+        date_column='date',
+        window_func=[('corr', func)],
+        min_periods=min_periods
+    )
+
+    frames = [g for _, g in sample_data.groupby('group')] if grouped else [sample_data.query("group == 'group_0'")]
+    expected = pd.concat([
+        _expected_expanding_apply(g, func, 1 if min_periods is None else min_periods) for g in frames
+    ]).loc[result.index]
+
+    # Rows come back in the caller's order
+    assert result.index.equals(data.index if not grouped else data.obj.index)
+    pd.testing.assert_series_equal(result['expanding_corr'], expected, check_names=False)
+
+@pytest.mark.parametrize("min_periods, grouped", product([None, 5], [False, True]))
+def test_augment_expanding_apply_series(sample_data, min_periods, grouped):
+
+    func = lambda x: pd.Series({'mean': x['value'].mean(), 'n': len(x)})
+
+    data = sample_data.groupby('group') if grouped else sample_data.query("group == 'group_0'")
+
+    result = data.augment_expanding_apply(
+        date_column='date',
+        window_func=[('stats', func)],
+        min_periods=min_periods
+    )
+
+    # A Series result is expanded into one float column per field
+    assert list(result.columns[-2:]) == ['expanding_stats_mean', 'expanding_stats_n']
+    assert (result[['expanding_stats_mean', 'expanding_stats_n']].dtypes == np.float64).all()
+
+    frames = [g for _, g in sample_data.groupby('group')] if grouped else [sample_data.query("group == 'group_0'")]
+    for field in ['mean', 'n']:
+        expected = pd.concat([
+            _expected_expanding_apply(g, lambda x: func(x)[field], 1 if min_periods is None else min_periods) for g in frames
+        ]).loc[result.index]
+        pd.testing.assert_series_equal(result[f'expanding_stats_{field}'], expected, check_names=False)
+
+@pytest.mark.parametrize("kind, grouped", product(['tuple', 'array', 'mixed'], [False, True]))
+def test_augment_expanding_apply_sequence(sample_data, kind, grouped):
+
+    funcs = {
+        'tuple': lambda x: (x['value'].mean(), len(x)),
+        'array': lambda x: np.array([x['value'].mean(), x['value2'].sum()]),
+        # Numeric at first, then a different type: the column falls back to objects
+        'mixed': lambda x: x['value'].mean() if len(x) < 5 else (x['value'].mean(), len(x)),
+    }
+    func = funcs[kind]
+
+    data = sample_data.groupby('group') if grouped else sample_data.query("group == 'group_0'")
+
+    result = data.augment_expanding_apply(date_column='date', window_func=[('f', func)])
+
+    # Non-scalar results are kept whole in a single object column
+    assert result['expanding_f'].dtype == object
+
+    frames = [g for _, g in sample_data.groupby('group')] if grouped else [sample_data.query("group == 'group_0'")]
+    for group_df in frames:
+        group_df = group_df.sort_values('date')
+        for i, index in enumerate(group_df.index):
+            expected = func(group_df.iloc[:i + 1])
+            np.testing.assert_allclose(np.asarray(result.loc[index, 'expanding_f'], dtype=float), np.asarray(expected, dtype=float))
+
+@pytest.mark.parametrize("min_periods, grouped", product([None, 5], [False, True]))
+def test_augment_expanding_apply_incremental(sample_data, min_periods, grouped):
+
+    # Missing values are skipped by both the incremental and the naive functions
+    sample_data = sample_data.assign(value3=np.random.default_rng(0).normal(size=len(sample_data)))
+    sample_data.loc[sample_data.index[[3, 40]], 'value'] = np.nan
+
+    def regression(x):
+        x = x.dropna(subset=['value', 'value2', 'value3'])
+        if len(x) == 0:
+            return pd.Series(np.nan, index=['Intercept', 'value2', 'value3'])
+        X = np.column_stack([np.ones(len(x)), x[['value2', 'value3']] - x[['value2', 'value3']].mean()])
+        coef = np.linalg.lstsq(X, x['value'] - x['value'].mean(), rcond=None)[0][1:]
+        return pd.Series([x['value'].mean() - x[['value2', 'value3']].mean() @ coef, *coef], index=['Intercept', 'value2', 'value3'])
+
+    data = sample_data.groupby('group') if grouped else sample_data.query("group == 'group_0'")
+
+    result = data.augment_expanding_apply(
+        date_column='date',
+        window_func=[
+            ('corr', pd_corr(x='value', y='value2')),
+            ('reg', pd_linear_regression(y='value', x=['value2', 'value3'])),
+        ],
+        min_periods=min_periods
+    )
+
+    assert result.index.equals(data.index if not grouped else data.obj.index)
+
+    # The running-sum kernels match the naive function applied to every window
+    frames = [g for _, g in sample_data.groupby('group')] if grouped else [sample_data.query("group == 'group_0'")]
+    min_periods = 1 if min_periods is None else min_periods
+    expected = pd.concat([
+        _expected_expanding_apply(g, lambda x: x['value'].corr(x['value2']), min_periods) for g in frames
+    ]).loc[result.index]
+    pd.testing.assert_series_equal(result['expanding_corr'], expected, check_names=False, atol=1e-10)
+
+    for field in ['Intercept', 'value2', 'value3']:
+        expected = pd.concat([
+            _expected_expanding_apply(g, lambda x: regression(x)[field], min_periods) for g in frames
+        ]).loc[result.index]
+        pd.testing.assert_series_equal(result[f'expanding_reg_{field}'], expected, check_names=False, atol=1e-8)
+
+@pytest.mark.parametrize("apply", [False, True])
+def test_augment_expanding_missing_group_key(sample_data, apply):
+    sample_data.loc[sample_data.index[:5], 'group'] = np.nan
+
+    if apply:
+        result = sample_data.groupby('group').augment_expanding_apply(date_column='date', window_func=[('sum', lambda x: x['value'].sum())])
+    else:
+        result = sample_data.groupby('group').augment_expanding(date_column='date', value_column='value', window_func='sum', show_progress=False)
+
+    # Rows with a missing group key are dropped, as pandas groupby does by default
+    assert result.index.equals(sample_data.index[5:])
+    assert result.iloc[:, -1].notna().all()
+
+@pytest.mark.parametrize("func, grouped", product(['mean', 'sum', 'std', 'var', 'min', 'max', 'count', 'median'], [False, True]))
+def test_augment_expanding_builtin(sample_data, func, grouped):
+
+    data = sample_data.groupby('group') if grouped else sample_data.query("group == 'group_0'")
+
+    result = data.augment_expanding(
+        date_column='date',
+        value_column=['value', 'value2'],
+        window_func=func,
+        min_periods=3
+    )
+
+    assert result.index.equals(data.index if not grouped else data.obj.index)
+
+    frames = [g for _, g in sample_data.groupby('group')] if grouped else [sample_data.query("group == 'group_0'")]
+    for col in ['value', 'value2']:
+        expected = pd.concat([
+            getattr(g.sort_values('date')[col].expanding(min_periods=3), func)() for g in frames
+        ]).loc[result.index]
+        pd.testing.assert_series_equal(result[f'{col}_expanding_{func}'], expected, check_names=False)
+
+def test_augment_expanding_invalid_func_name(sample_data):
+    with pytest.raises(ValueError):
+        sample_data.augment_expanding(date_column='date', value_column='value', window_func='invalid_func')
+
+@pytest.mark.parametrize("func, min_periods", product(['sum', 'mean', 'min', 'max', 'count'], [0, 1, 3]))
+def test_expanding_numpy_matches_pandas(func, min_periods):
+    values = np.array([np.nan, 2.0, np.nan, -1.5, 4.0, 4.0, np.nan, 0.5, 10.0])
+
+    result = _expanding_numpy(func, values, min_periods)
+    expected = getattr(pd.Series(values).expanding(min_periods=min_periods), func)().to_numpy()
+
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+@pytest.mark.parametrize("func", ['mean', 'sum', 'min', 'max', 'std'])
+def test_augment_expanding_polars_matches_pandas(sample_data, func):
+
+    kwargs = dict(date_column='date', value_column=['value', 'value2'], window_func=func, min_periods=2)
+
+    result_polars = sample_data.groupby('group').augment_expanding(engine='polars', **kwargs)
+    result_pandas = sample_data.groupby('group').augment_expanding(engine='pandas', **kwargs)
+
+    # The polars engine returns the rows ordered by the original index
+    pd.testing.assert_frame_equal(
+        result_polars,
+        result_pandas.sort_index().reset_index(drop=True),
+        check_dtype=False
+    )
+
+@pytest.mark.parametrize("engine", ['pandas', 'polars'])
+def test_augment_expanding_leaves_input_untouched(sample_data, engine):
+    original = sample_data.copy()
+
+    sample_data.groupby('group').augment_expanding(
+        date_column='date', value_column='value', window_func=['mean', ('range', lambda x: x.max() - x.min())], engine=engine
+    )
+    sample_data.augment_expanding_apply(date_column='date', window_func=[('n', lambda x: len(x))])
+
+    pd.testing.assert_frame_equal(sample_data, original)
+
+def test_augment_expanding_parallel(sample_data):
+    kwargs = dict(
+        date_column='date', value_column=['value', 'value2'],
+        window_func=['mean', 'std', ('range', lambda x: x.max() - x.min())],
+        show_progress=False
+    )
+
+    result_parallel = sample_data.groupby('group').augment_expanding(threads=2, **kwargs)
+    result_serial = sample_data.groupby('group').augment_expanding(threads=1, **kwargs)
+
+    pd.testing.assert_frame_equal(result_parallel, result_serial)
+
+@pytest.mark.parametrize("engine, grouped", product(['pandas', 'polars'], [False, True]))
+def test_augment_expanding_float32(sample_data, engine, grouped):
+    kwargs = dict(date_column='date', value_column='value', window_func=['mean', 'max', 'std'], engine=engine)
+
+    data = sample_data.groupby('group') if grouped else sample_data.query("group == 'group_0'")
+
+    result_f32 = data.augment_expanding(precision='f32', **kwargs)
+    result_f64 = data.augment_expanding(**kwargs)
+
+    new_columns = ['value_expanding_mean', 'value_expanding_max', 'value_expanding_std']
+    assert (result_f32[new_columns].dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(result_f32[new_columns], result_f64[new_columns], check_dtype=False, rtol=1e-5)
+
+def test_augment_expanding_invalid_precision(sample_data):
+    with pytest.raises(ValueError):
+        sample_data.augment_expanding(date_column='date', value_column='value', precision='f16')
+
+@pytest.mark.parametrize("engine", ['pandas', 'polars'])
+def test_augment_expanding_quantile_warns_once(sample_data, engine, monkeypatch):
+    # Record the calls directly, since warnings.warn may be replaced by other imported packages
+    messages = []
+    monkeypatch.setattr(warnings, 'warn', lambda message, *args, **kwargs: messages.append(message))
+
+    result = sample_data.groupby('group').augment_expanding(
+        date_column='date', value_column=['value', 'value2'], window_func=['quantile', 'median'], engine=engine, show_progress=False
+    )
+
+    assert len([m for m in messages if 'quantile' in m]) == 1
+    for col in ['value', 'value2']:
+        np.testing.assert_allclose(result[f'{col}_expanding_quantile_50'], result[f'{col}_expanding_median'])
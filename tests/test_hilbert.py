@@ -0,0 +1,131 @@
+import pytest
+import pandas as pd
+import numpy as np
+import pytimetk as tk
+import importlib.util
+
+from scipy.signal import hilbert
+from itertools import product
+
+# Sample data for testing: groups of even and odd length
+@pytest.fixture
+def df_sample():
+    rng = np.random.default_rng(123)
+    data = []
+    for i, n in enumerate([24, 25, 40]):
+        data.append(pd.DataFrame({
+            'id': f'id_{i}',
+            'date': pd.date_range('2021-01-01', periods=n, freq='D'),
+            'value': rng.normal(size=n).cumsum(),
+            'value2': rng.integers(0, 10, n).astype(float),
+        }))
+    return pd.concat(data, ignore_index=True)
+
+def _check_hilbert(result, df, value_column):
+    for col in value_column:
+        expected = hilbert(df[col].to_numpy())
+        np.testing.assert_allclose(result[f'{col}_hilbert_real'].to_numpy(), expected.real, atol=1e-10)
+        np.testing.assert_allclose(result[f'{col}_hilbert_imag'].to_numpy(), expected.imag, atol=1e-10)
+
+@pytest.mark.parametrize("engine, grouped", product(['pandas', 'polars'], [False, True]))
+def test_augment_hilbert_matches_scipy(df_sample, engine, grouped):
+    value_column = ['value', 'value2']
+
+    data = df_sample.groupby('id') if grouped else df_sample.query("id == 'id_1'")
+
+    result = data.augment_hilbert(date_column='date', value_column=value_column, engine=engine)
+
+    assert len(result) == (len(df_sample) if grouped else 25)
+    frames = [g for _, g in df_sample.groupby('id')] if grouped else [df_sample.query("id == 'id_1'")]
+    for group_df in frames:
+        result_group = result[result['id'] == group_df['id'].iloc[0]].sort_values('date')
+        _check_hilbert(result_group, group_df, value_column)
+
+@pytest.mark.parametrize("engine", ['pandas', 'polars'])
+def test_augment_hilbert_shuffled(df_sample, engine):
+    kwargs = dict(date_column='date', value_column=['value', 'value2'], engine=engine)
+
+    result_shuffled = df_sample.sample(frac=1, random_state=1).groupby('id').augment_hilbert(**kwargs)
+    result_sorted = df_sample.groupby('id').augment_hilbert(**kwargs)
+
+    # Each group is transformed in date order, whatever the input order
+    pd.testing.assert_frame_equal(
+        result_shuffled.sort_values(['id', 'date']).reset_index(drop=True),
+        result_sorted.sort_values(['id', 'date']).reset_index(drop=True),
+        check_dtype=False
+    )
+
+@pytest.mark.parametrize("engine, threads", product(['pandas', 'polars'], [2, -1]))
+def test_augment_hilbert_threads(df_sample, engine, threads):
+    kwargs = dict(date_column='date', value_column=['value', 'value2'], engine=engine)
+
+    # The groups have different lengths, so they are transformed concurrently
+    result_threads = df_sample.groupby('id').augment_hilbert(threads=threads, **kwargs)
+    result_serial = df_sample.groupby('id').augment_hilbert(threads=1, **kwargs)
+
+    pd.testing.assert_frame_equal(result_threads, result_serial)
+
+def test_augment_hilbert_cuda(df_sample):
+    kwargs = dict(date_column='date', value_column=['value', 'value2'])
+
+    if importlib.util.find_spec('cupy') is None:
+        with pytest.raises(ImportError):
+            df_sample.groupby('id').augment_hilbert(engine='cuda', **kwargs)
+    else:
+        pd.testing.assert_frame_equal(
+            df_sample.groupby('id').augment_hilbert(engine='cuda', **kwargs),
+            df_sample.groupby('id').augment_hilbert(engine='pandas', **kwargs),
+            atol=1e-10
+        )
+
+@pytest.mark.parametrize("engine", ['pandas', 'polars'])
+def test_augment_hilbert_value_column_str(df_sample, engine):
+    result_str = df_sample.groupby('id').augment_hilbert(date_column='date', value_column='value', engine=engine)
+    result_list = df_sample.groupby('id').augment_hilbert(date_column='date', value_column=['value'], engine=engine)
+
+    pd.testing.assert_frame_equal(result_str, result_list)
+
+def test_augment_hilbert_missing_column(df_sample):
+    with pytest.raises(ValueError):
+        df_sample.augment_hilbert(date_column='date', value_column=['missing'])
+
+def test_augment_hilbert_invalid_engine(df_sample):
+    with pytest.raises(ValueError):
+        df_sample.augment_hilbert(date_column='date', value_column=['value'], engine='invalid')
+
+@pytest.mark.parametrize("engine, grouped", product(['pandas', 'polars'], [False, True]))
+def test_augment_hilbert_float32(df_sample, engine, grouped):
+    data = df_sample.groupby('id') if grouped else df_sample
+    kwargs = dict(date_column='date', value_column=['value'], engine=engine)
+
+    result_f32 = data.augment_hilbert(precision='f32', **kwargs).sort_values(['id', 'date'])
+    result_f64 = data.augment_hilbert(**kwargs).sort_values(['id', 'date'])
+
+    new_columns = ['value_hilbert_real', 'value_hilbert_imag']
+    assert (result_f32[new_columns].dtypes == np.float32).all()
+    assert (result_f64[new_columns].dtypes == np.float64).all()
+    pd.testing.assert_frame_equal(
+        result_f32[new_columns].reset_index(drop=True),
+        result_f64[new_columns].reset_index(drop=True),
+        check_dtype=False, atol=1e-4
+    )
+
+def test_augment_hilbert_invalid_precision(df_sample):
+    with pytest.raises(ValueError):
+        df_sample.augment_hilbert(date_column='date', value_column=['value'], precision='f16')
+
+def test_augment_hilbert_fft_backend(df_sample):
+    kwargs = dict(date_column='date', value_column=['value'])
+
+    if importlib.util.find_spec('pyfftw') is None:
+        with pytest.raises(ImportError):
+            df_sample.groupby('id').augment_hilbert(fft_backend='pyfftw', **kwargs)
+    else:
+        pd.testing.assert_frame_equal(
+            df_sample.groupby('id').augment_hilbert(fft_backend='pyfftw', **kwargs),
+            df_sample.groupby('id').augment_hilbert(**kwargs),
+            atol=1e-10
+        )
+
+    with pytest.raises(ValueError):
+        df_sample.augment_hilbert(fft_backend='invalid', **kwargs)